@@ -0,0 +1,49 @@
+"""Пропускная способность JSON API против HTML-страниц лент.
+
+Запуск: python benchmarks/api_vs_html.py
+"""
+import time
+
+from utils import prerender, report, setup_django
+
+REQUESTS = 200
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from posts.models import Group, Post, User  # noqa: E402
+
+author = User.objects.create_user(username='bench', first_name='Bench')
+group = Group.objects.create(title='Bench', slug='bench', description='-')
+Post.objects.bulk_create(prerender([
+    Post(author=author, group=group, text=f'Post {number} ' * 40)
+    for number in range(1000)
+]))
+
+PAIRS = [
+    ('index', '/', '/api/v1/posts/?expand=author,group'),
+    ('group', '/group/bench/', '/api/v1/groups/bench/posts/?expand=author'),
+    ('profile', '/profile/bench/', '/api/v1/profiles/bench/posts/'),
+]
+
+
+def measure(client, url):
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        # шаблонный кэш главной не должен влиять на замер
+        cache.clear()
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return REQUESTS / (time.perf_counter() - started)
+
+
+client = Client()
+rows = []
+for name, html_url, api_url in PAIRS:
+    html = measure(client, html_url)
+    api = measure(client, api_url)
+    rows.append((name, f'html {html:6.0f} req/s, api {api:6.0f} req/s'))
+report('feed throughput', rows)
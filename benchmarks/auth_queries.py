@@ -0,0 +1,67 @@
+"""Сколько запросов к базе делает авторизованный запрос до кода view.
+
+Запуск: python benchmarks/auth_queries.py
+
+Сравнивает стандартные сессии и AuthenticationMiddleware с cached_db
+сессиями и core.middleware.CachedAuthenticationMiddleware на странице
+без собственных запросов (about:author). Кэш пользователя и сессий
+включается только с общим для процессов кэшем (SHARED_CACHE), поэтому
+второй замер идёт на FileBasedCache во временном каталоге.
+"""
+import tempfile
+
+from utils import report, setup_django
+
+REQUESTS = 200
+
+setup_django()
+
+import time  # noqa: E402
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from posts.models import User  # noqa: E402
+
+DEFAULT = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'MIDDLEWARE': [
+        'django.contrib.auth.middleware.AuthenticationMiddleware'
+        if name == 'core.middleware.CachedAuthenticationMiddleware'
+        else name
+        for name in settings.MIDDLEWARE
+    ],
+}
+SHARED = {
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(),
+    }},
+    'SHARED_CACHE': True,
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+}
+
+
+def measure():
+    client = Client()
+    client.force_login(User.objects.get(username='bench'))
+    client.get('/about/author/')
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            client.get('/about/author/')
+        elapsed = time.perf_counter() - started
+    return [
+        ('queries per request', len(queries) / REQUESTS),
+        ('time per request', f'{elapsed / REQUESTS * 1000:.2f} ms'),
+    ]
+
+
+User.objects.create_user(username='bench')
+with override_settings(**DEFAULT):
+    report('db sessions + AuthenticationMiddleware', measure())
+with override_settings(**SHARED):
+    report('cached_db sessions + CachedAuthenticationMiddleware',
+           measure())
@@ -0,0 +1,43 @@
+"""Размер и время ответа при листании ленты: страница против фрагмента.
+
+Запуск: python benchmarks/feed_fragments.py
+"""
+import time
+
+from utils import prerender, report, setup_django
+
+REQUESTS = 200
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from posts.models import Post, User  # noqa: E402
+from posts.utils import encode_cursor  # noqa: E402
+
+author = User.objects.create_user(username='bench', first_name='Bench')
+Post.objects.bulk_create(prerender([
+    Post(author=author, text=f'Post {number} ' * 40) for number in range(1000)
+]))
+
+
+def measure(client, url, **headers):
+    size = 0
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        cache.clear()
+        response = client.get(url, **headers)
+        size = len(response.content)
+    elapsed = (time.perf_counter() - started) / REQUESTS
+    return f'{size:7d} bytes, {elapsed * 1000:6.2f} ms'
+
+
+client = Client()
+last = Post.objects.all()[9]
+cursor = encode_cursor(last.pub_date, last.pk)
+report('page turn on /profile/bench/', [
+    ('full page', measure(client, '/profile/bench/?page=2')),
+    ('fragment', measure(client, f'/profile/bench/?cursor={cursor}',
+                         HTTP_X_FRAGMENT='1')),
+])
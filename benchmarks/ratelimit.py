@@ -0,0 +1,50 @@
+"""Накладные расходы core.ratelimit на один запрос, в микросекундах.
+
+Запуск: python benchmarks/ratelimit.py
+
+Замеряет hit() на одном ключе (типичный клиент в пределах лимита), hit()
+на множестве ключей (первый запрос каждого клиента) и вызов view через
+декоратор ratelimit в сравнении с той же view без него.
+"""
+from utils import report, setup_django
+
+CALLS = 20000
+
+setup_django(RATELIMITS={'bench': (10 ** 9, 60)})
+
+import time  # noqa: E402
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from core.ratelimit import hit, ratelimit  # noqa: E402
+
+
+def per_call(func, calls=CALLS):
+    started = time.perf_counter()
+    for index in range(calls):
+        func(index)
+    return f'{(time.perf_counter() - started) / calls * 10 ** 6:.2f} us'
+
+
+def view(request):
+    return HttpResponse()
+
+
+limited = ratelimit('bench')(view)
+request = RequestFactory().post('/')
+request.user = AnonymousUser()
+
+cache.clear()
+rows = [
+    ('hit, same client', per_call(
+        lambda index: hit('bench', 'ip1', 10 ** 9, 60))),
+    ('hit, new client', per_call(
+        lambda index: hit('bench', f'ip{index}', 10 ** 9, 60))),
+    ('view without ratelimit', per_call(lambda index: view(request))),
+    ('view with ratelimit', per_call(lambda index: limited(request))),
+]
+report(f"{CALLS} calls, {settings.CACHES['default']['BACKEND']}", rows)
@@ -0,0 +1,120 @@
+"""Нагрузочный тест конкурентной записи комментариев в SQLite.
+
+Запуск: python benchmarks/sqlite_writes.py [--baseline|--tuned|--serialized]
+
+Без аргументов запускает все режимы по очереди и печатает долю ошибок
+'database is locked' и пропускную способность. В каждом режиме пишут
+PROCESSES процессов по THREADS потоков, как воркеры gunicorn: потоки
+одного процесса сменяют друг друга на GIL и почти не пересекаются,
+а процессы конкурируют за блокировку базы по-настоящему. Режим
+--serialized отправляет записи в общий поток core.writer своего
+процесса.
+"""
+import subprocess
+import sys
+import threading
+import time
+
+from utils import report, setup_django
+
+PROCESSES = 4
+THREADS = 4
+WRITES_PER_THREAD = 100
+# Время на запуск Django в процессах, чтобы все начали писать разом
+START_DELAY = 3
+
+MODES = ('--baseline', '--tuned', '--serialized')
+
+
+def settings_for(mode):
+    if mode == '--serialized':
+        return {'SERIALIZED_WRITES': True}
+    if mode == '--tuned':
+        return {}
+    return {'SQLITE_PRAGMAS': {}, 'WRITE_RETRY_ATTEMPTS': 1}
+
+
+def setup(mode, database=None):
+    setup_django(database, **settings_for(mode))
+    if mode == '--baseline':
+        # стандартный timeout модуля sqlite3 вместо увеличенного
+        from django.conf import settings
+        settings.DATABASES['default']['OPTIONS'] = {}
+
+
+def write(mode, database, post_id, start_at):
+    """Процесс-воркер: пишет комментарии в THREADS потоков.
+
+    Печатает число ошибок и время от общего старта до конца записи.
+    """
+    setup(mode, database)
+    from django.db import OperationalError, connection
+    from core.writer import run_write
+    from posts.models import Comment, Post
+
+    errors = []
+
+    def add_comment(number):
+        # как большинство записей: чтение и запись в одной транзакции;
+        # без WAL поднять блокировку чтения до записи удаётся не всегда
+        post = Post.objects.get(pk=post_id)
+        return Comment.objects.create(post=post, author_id=post.author_id,
+                                      text=str(number))
+
+    def worker():
+        for number in range(WRITES_PER_THREAD):
+            try:
+                run_write(add_comment, number)
+            except OperationalError:
+                errors.append(number)
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    time.sleep(max(start_at - time.time(), 0))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(len(errors), time.time() - start_at)
+
+
+def run(mode):
+    setup(mode)
+    from django.conf import settings
+    from posts.models import Post, User
+
+    author = User.objects.create_user(username='bench')
+    post = Post.objects.create(author=author, text='bench')
+    start_at = time.time() + START_DELAY
+    workers = [
+        subprocess.Popen(
+            [sys.executable, __file__, mode,
+             settings.DATABASES['default']['NAME'], str(post.pk),
+             str(start_at)],
+            stdout=subprocess.PIPE, text=True)
+        for _ in range(PROCESSES)
+    ]
+    errors = elapsed = 0
+    for worker in workers:
+        output, _ = worker.communicate()
+        worker_errors, worker_elapsed = output.split()
+        errors += int(worker_errors)
+        elapsed = max(elapsed, float(worker_elapsed))
+
+    total = PROCESSES * THREADS * WRITES_PER_THREAD
+    report(mode.lstrip('-'), [
+        ('writes', total),
+        ('errors', f'{errors} ({errors / total:.1%})'),
+        ('throughput', f'{(total - errors) / elapsed:.0f} writes/s'),
+    ])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] in MODES:
+        write(sys.argv[1], sys.argv[2], int(sys.argv[3]),
+              float(sys.argv[4]))
+    elif len(sys.argv) > 1 and sys.argv[1] in MODES:
+        run(sys.argv[1])
+    else:
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, mode], check=True)
@@ -0,0 +1,40 @@
+"""Память на SSE-подписку и стоимость рассылки события.
+
+Запуск: python benchmarks/sse_connections.py
+"""
+import time
+import tracemalloc
+
+from utils import report, setup_django
+
+SUBSCRIBERS = 1000
+EVENTS = 100
+
+setup_django(SSE_MAX_CONNECTIONS=SUBSCRIBERS)
+
+from core.pubsub import Broker  # noqa: E402
+from api.events import EventStream  # noqa: E402
+
+broker = Broker(max_subscribers=SUBSCRIBERS, queue_size=EVENTS)
+tracemalloc.start()
+before = tracemalloc.take_snapshot()
+streams = [
+    EventStream(broker.subscribe(['posts', f'author:{number}']), 'post', [])
+    for number in range(SUBSCRIBERS)
+]
+idle = tracemalloc.take_snapshot().compare_to(before, 'filename')
+idle_bytes = sum(stat.size_diff for stat in idle)
+
+started = time.perf_counter()
+for pk in range(EVENTS):
+    broker.publish(['posts'], ('post', pk))
+publish_time = (time.perf_counter() - started) / EVENTS
+full = tracemalloc.take_snapshot().compare_to(before, 'filename')
+full_bytes = sum(stat.size_diff for stat in full)
+tracemalloc.stop()
+
+report(f'{SUBSCRIBERS} subscribers, queue size {EVENTS}', [
+    ('memory per idle connection', f'{idle_bytes / SUBSCRIBERS:.0f} bytes'),
+    ('memory per full queue', f'{full_bytes / SUBSCRIBERS:.0f} bytes'),
+    ('publish to all subscribers', f'{publish_time * 1000:.2f} ms'),
+])
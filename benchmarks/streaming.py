@@ -0,0 +1,65 @@
+"""Время до первого байта (TTFB) и полное время ответа ленты и поста:
+обычный render() против потокового core.streaming.
+
+Клиент, как любой браузер, принимает gzip, и ответ проходит весь стек
+middleware. TTFB - время до части, после распаковки которой получен
+весь <head> страницы; в скобках - число непустых частей ответа.
+
+Запуск: python benchmarks/streaming.py
+"""
+import time
+import zlib
+
+from utils import report, setup_django
+
+REQUESTS = 100
+
+setup_django()
+
+from django.core.cache import cache  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from posts.models import Comment, Post, User  # noqa: E402
+
+author = User.objects.create_user(username='bench', first_name='Bench')
+for number in range(30):
+    Post.objects.create(author=author, text=f'Post {number} ' * 200)
+post = Post.objects.first()
+for number in range(50):
+    Comment.objects.create(post=post, author=author,
+                           text=f'Comment {number} ' * 20)
+
+
+def measure(url):
+    client = Client(HTTP_ACCEPT_ENCODING='gzip')
+    client.force_login(author)
+    first_byte = total = chunks_count = 0
+    for _ in range(REQUESTS):
+        cache.clear()
+        started = time.perf_counter()
+        response = client.get(url)
+        assert response['Content-Encoding'] == 'gzip'
+        chunks = response.streaming_content if response.streaming else [
+            response.content]
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        page = b''
+        head_at = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+            chunks_count += 1
+            page += decompressor.decompress(chunk)
+            if head_at is None and b'</head>' in page:
+                head_at = time.perf_counter() - started
+        first_byte += head_at
+        total += time.perf_counter() - started
+    return (f'TTFB {first_byte / REQUESTS * 1000:6.2f} ms, '
+            f'total {total / REQUESTS * 1000:6.2f} ms '
+            f'({chunks_count / REQUESTS:.0f} parts)')
+
+
+for url in ('/', f'/posts/{post.pk}/'):
+    rows = [('render()', measure(url))]
+    with override_settings(STREAM_PAGES=True):
+        rows.append(('streaming', measure(url)))
+    report(url, rows)
@@ -0,0 +1,90 @@
+"""Время загрузки и рендера каждого шаблона проекта.
+
+Запуск: python benchmarks/templates.py
+
+Для каждого шаблона из yatube/templates сравнивает загрузку с разбором
+на каждом запросе (filesystem + app_directories, как при DEBUG) и
+рендер шаблона, заранее скомпилированного cached.Loader.
+"""
+import os
+import timeit
+
+from utils import PROJECT_DIR, report, setup_django
+
+ITERATIONS = 200
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.paginator import Paginator  # noqa: E402
+from django.template import Engine, RequestContext  # noqa: E402
+from django.template.backends.django import (  # noqa: E402
+    get_installed_libraries)
+from django.test import RequestFactory  # noqa: E402
+
+from core.warmup import get_template_names  # noqa: E402
+from posts.forms import CommentForm, PostForm  # noqa: E402
+from posts.models import Comment, Group, Post, User  # noqa: E402
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def make_engine(loaders):
+    options = settings.TEMPLATES[0]['OPTIONS']
+    return Engine(
+        dirs=settings.TEMPLATES[0]['DIRS'],
+        context_processors=options['context_processors'],
+        loaders=loaders,
+        libraries=get_installed_libraries(),
+    )
+
+
+author = User.objects.create_user(username='bench', first_name='Bench')
+group = Group.objects.create(title='Bench', slug='bench', description='-')
+for number in range(30):
+    Post.objects.create(author=author, group=group, text=f'Post {number}')
+post = Post.objects.first()
+comment = Comment.objects.create(post=post, author=author, text='Comment')
+CONTEXT = {
+    'post': post,
+    'comment': comment,
+    'page_obj': Paginator(Post.objects.all(), 10).get_page(1),
+    'author': author,
+    'group': group,
+    'user_post': post,
+    'all_comments': post.comments.all(),
+    'form': PostForm(),
+    'form_comments': CommentForm(),
+}
+
+request = RequestFactory().get('/')
+request.user = AnonymousUser()
+uncached = make_engine(LOADERS)
+cached = make_engine([('django.template.loaders.cached.Loader', LOADERS)])
+
+project_templates = os.path.join(PROJECT_DIR, 'templates')
+names = [
+    name for name in get_template_names(uncached)
+    if os.path.exists(os.path.join(project_templates, name))
+]
+rows = []
+for name in names:
+    cached.get_template(name)
+
+    def render_uncached():
+        uncached.get_template(name).render(RequestContext(request, CONTEXT))
+
+    def render_cached():
+        cached.get_template(name).render(RequestContext(request, CONTEXT))
+
+    before = timeit.timeit(render_uncached, number=ITERATIONS)
+    after = timeit.timeit(render_cached, number=ITERATIONS)
+    rows.append((name, (
+        f'{before / ITERATIONS * 1e6:8.0f} us -> '
+        f'{after / ITERATIONS * 1e6:6.0f} us'
+    )))
+report('render time per template: uncached -> cached loader', rows)
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'yatube')
+
+
+def setup_django(database=None, **overrides):
+    """Настраивает Django на временной файловой базе и применяет миграции.
+
+    database - путь к базе, уже подготовленной другим процессом: она
+    используется как есть. Остальные именованные аргументы
+    переопределяют одноимённые настройки проекта.
+    """
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    if database is not None:
+        settings.DATABASES['default']['NAME'] = database
+        django.setup()
+        return
+    settings.DATABASES['default']['NAME'] = os.path.join(
+        tempfile.mkdtemp(), 'bench.sqlite3')
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def report(title, rows):
+    """Печатает результаты замера в виде выровненной таблицы."""
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print(f'  {name.ljust(width)}  {value}')
+
+
+def prerender(posts):
+    """Заполняет HTML постов, как Post.save(), для bulk_create."""
+    from django.conf import settings
+    from posts.utils import render_text
+
+    for post in posts:
+        post.text_html, post.excerpt_html, post.is_truncated = render_text(
+            post.text, settings.POST_EXCERPT_LENGTH)
+    return posts
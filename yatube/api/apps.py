@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
+
+    def ready(self):
+        from posts.signals import posts_bulk_changed
+        from .cache import (invalidate_comment_post, invalidate_post,
+                            invalidate_posts)
+
+        for signal in (post_save, post_delete):
+            signal.connect(invalidate_post, sender='posts.Post')
+            signal.connect(invalidate_comment_post, sender='posts.Comment')
+        posts_bulk_changed.connect(invalidate_posts)
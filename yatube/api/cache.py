@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from posts.models import Post
+from . import serializers
+
+POST_KEY = 'api:post:{pk}'
+
+
+def serialize_post(post):
+    return {
+        'id': post.id,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'author': serializers.serialize_author(post.author),
+        'group': (serializers.serialize_group(post.group)
+                  if post.group else None),
+        'image': post.image.url if post.image else None,
+        'comment_count': post.comment_count,
+    }
+
+
+def get_posts(ids):
+    """Словарь id -> данные поста: сначала кэш, промахи одним запросом."""
+    keys = {POST_KEY.format(pk=pk): pk for pk in ids}
+    found = {keys[key]: data for key, data in cache.get_many(keys).items()}
+    missing = set(ids) - set(found)
+    if missing:
+        posts = (
+            Post.objects.filter(id__in=missing)
+            .select_related('author', 'group')
+        )
+        loaded = {post.id: serialize_post(post) for post in posts}
+        cache.set_many(
+            {POST_KEY.format(pk=pk): data for pk, data in loaded.items()},
+            settings.API_POST_CACHE_TIMEOUT,
+        )
+        found.update(loaded)
+    return found
+
+
+def invalidate_post(sender, instance, **kwargs):
+    cache.delete(POST_KEY.format(pk=instance.pk))
+
+
+def invalidate_comment_post(sender, instance, **kwargs):
+    cache.delete(POST_KEY.format(pk=instance.post_id))
+
+
+def invalidate_posts(sender, ids, **kwargs):
+    cache.delete_many([POST_KEY.format(pk=pk) for pk in ids])
@@ -0,0 +1,136 @@
+import time
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from core.pubsub import broker
+from posts.models import Comment, Follow, Group, Post
+from .views import error
+
+
+class Unauthorized(Exception):
+    pass
+
+
+def resolve_channel(request):
+    """Каналы брокера, тип событий и queryset для ?channel=.
+
+    Поддерживаются каналы posts, follow, group:<slug> и comments:<id>.
+    """
+    spec = request.GET.get('channel', 'posts')
+    if spec == 'posts':
+        return ['posts'], 'post', Post.objects.all()
+    if spec == 'follow':
+        if not request.user.is_authenticated:
+            raise Unauthorized
+        authors = list(Follow.objects.filter(user=request.user)
+                       .values_list('author_id', flat=True))
+        return ([f'author:{pk}' for pk in authors], 'post',
+                Post.objects.filter(author_id__in=authors))
+    kind, _, value = spec.partition(':')
+    if kind == 'group':
+        group = get_object_or_404(Group.objects.only('id'), slug=value)
+        return [f'group:{group.id}'], 'post', group.posts.all()
+    if kind == 'comments':
+        post = get_object_or_404(Post.objects.only('id'), pk=int(value))
+        return ([f'comments:{post.id}'], 'comment',
+                Comment.objects.filter(post=post))
+    raise ValueError('Неизвестный канал')
+
+
+def ids_since(queryset, since):
+    return list(queryset.filter(id__gt=since).order_by('id')
+                .values_list('id', flat=True)[:settings.CHANGES_MAX_IDS])
+
+
+def format_event(kind, pk):
+    return f'id: {pk}\nevent: {kind}\ndata: {pk}\n\n'
+
+
+class EventStream:
+    """Тело SSE-ответа: пропущенные события, затем события брокера.
+
+    Подписка снимается в close(), который Django вызывает при закрытии
+    ответа, даже если поток так и не начали читать.
+    """
+
+    def __init__(self, subscription, kind, missed):
+        self.subscription = subscription
+        self.kind = kind
+        self.missed = missed
+        self.closed = False
+
+    def __iter__(self):
+        return self.events()
+
+    def events(self):
+        yield f'retry: {settings.SSE_RETRY}\n\n'
+        last = 0
+        for pk in self.missed:
+            yield format_event(self.kind, pk)
+            last = pk
+        deadline = time.monotonic() + settings.SSE_MAX_DURATION
+        while time.monotonic() < deadline:
+            if self.subscription.overflowed:
+                # клиент догоняет пропущенное через api:changes
+                yield f'event: resync\ndata: {last}\n\n'
+                return
+            event = self.subscription.get(timeout=settings.SSE_KEEPALIVE)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            kind, pk = event
+            if pk > last:
+                yield format_event(kind, pk)
+                last = pk
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            broker.unsubscribe(self.subscription)
+
+
+@require_GET
+def events(request):
+    """Поток новых id постов или комментариев канала (text/event-stream)."""
+    try:
+        channels, kind, queryset = resolve_channel(request)
+        since = int(request.META.get('HTTP_LAST_EVENT_ID')
+                    or request.GET.get('since') or 0)
+    except Unauthorized:
+        return error('Требуется авторизация', status=401)
+    except ValueError as exc:
+        return error(str(exc))
+
+    subscription = broker.subscribe(channels)
+    if subscription is None:
+        response = error('Слишком много подключений', status=503)
+        response['Retry-After'] = settings.SSE_RETRY // 1000
+        return response
+    missed = ids_since(queryset, since) if since else []
+    response = StreamingHttpResponse(
+        EventStream(subscription, kind, missed),
+        content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def changes(request):
+    """Запасной вариант для клиентов без SSE: id новее ?since=."""
+    try:
+        _, kind, queryset = resolve_channel(request)
+        since = int(request.GET.get('since', 0))
+    except Unauthorized:
+        return error('Требуется авторизация', status=401)
+    except ValueError as exc:
+        return error(str(exc))
+    ids = ids_since(queryset, since)
+    return JsonResponse({
+        'event': kind,
+        'ids': ids,
+        'since': ids[-1] if ids else since,
+    })
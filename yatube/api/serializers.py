@@ -0,0 +1,114 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from posts.models import Group, User
+
+# Поле ответа -> поля модели, которые нужно загрузить для него
+POST_FIELDS = {
+    'id': ('id',),
+    'text': ('text',),
+    'pub_date': ('pub_date',),
+    'author': ('author',),
+    'group': ('group',),
+    'image': ('image',),
+}
+COMMENT_FIELDS = {
+    'id': ('id',),
+    'post': ('post',),
+    'text': ('text',),
+    'created': ('created',),
+    'author': ('author',),
+}
+EXPANDABLE = ('author', 'group')
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def parse_fields(request, allowed):
+    """Поля из ?fields=, по умолчанию все; неизвестное поле - ValueError."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(allowed)
+    fields = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValueError(
+            f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def parse_expand(request, fields):
+    expand = request.GET.get('expand', '')
+    expand = {name.strip() for name in expand.split(',') if name.strip()}
+    unknown = expand - set(EXPANDABLE)
+    if unknown:
+        raise ValueError(
+            f'Нельзя раскрыть: {", ".join(sorted(unknown))}')
+    return expand & set(fields)
+
+
+def get_projection(fields, allowed, required):
+    """Аргументы для .only(): поля ответа плюс нужные для пагинации."""
+    projection = set(required)
+    for name in fields:
+        projection.update(allowed[name])
+    return sorted(projection)
+
+
+def load_related(objects, expand):
+    """Загружает авторов и группы одним запросом на каждую модель."""
+    related = {}
+    if 'author' in expand:
+        ids = {obj.author_id for obj in objects}
+        related['author'] = User.objects.only(
+            'id', 'username', 'first_name', 'last_name').in_bulk(ids)
+    if 'group' in expand:
+        ids = {obj.group_id for obj in objects if obj.group_id}
+        related['group'] = Group.objects.only(
+            'id', 'slug', 'title').in_bulk(ids)
+    return related
+
+
+def serialize_author(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.get_full_name(),
+    }
+
+
+def serialize_group(group):
+    return {'id': group.id, 'slug': group.slug, 'title': group.title}
+
+
+def serialize(obj, fields, related):
+    data = {}
+    for name in fields:
+        if name == 'author':
+            authors = related.get('author')
+            data[name] = (serialize_author(authors[obj.author_id])
+                          if authors else obj.author_id)
+        elif name == 'group':
+            groups = related.get('group')
+            data[name] = (serialize_group(groups[obj.group_id])
+                          if groups and obj.group_id else obj.group_id)
+        elif name == 'post':
+            data[name] = obj.post_id
+        elif name == 'image':
+            data[name] = obj.image.url if obj.image else None
+        else:
+            data[name] = getattr(obj, name)
+    return data
+
+
+def encode(data):
+    return encoder.encode(data)
+
+
+def encode_page(items, next_cursor):
+    """Части JSON-ответа: уже закодированные элементы и обрамление."""
+    yield '{"results": ['
+    for index, item in enumerate(items):
+        yield item if index == 0 else ',' + item
+    yield '], "next": ' + json.dumps(next_cursor) + '}'
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.pubsub import broker
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(SSE_KEEPALIVE=0.01, SSE_MAX_DURATION=1)
+class EventsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='description',
+        )
+        cls.post = Post.objects.create(author=cls.user, text='Пост',
+                                       group=cls.group)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_stream_receives_published_post(self):
+        """Новый пост группы приходит подписчику канала группы."""
+        response = self.guest_client.get(
+            reverse('api:events'), {'channel': f'group:{self.group.slug}'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertTrue(next(stream).startswith(b'retry:'))
+        broker.publish(['posts', f'group:{self.group.id}'],
+                       ('post', 42))
+        self.assertEqual(next(stream),
+                         b'id: 42\nevent: post\ndata: 42\n\n')
+        response.close()
+        self.assertEqual(broker.count, 0)
+
+    def test_last_event_id_replays_missed(self):
+        """После переподключения приходят пропущенные комментарии."""
+        comments = [
+            Comment.objects.create(post=self.post, author=self.user,
+                                   text=str(i))
+            for i in range(3)
+        ]
+        response = self.guest_client.get(
+            reverse('api:events'), {'channel': f'comments:{self.post.id}'},
+            HTTP_LAST_EVENT_ID=str(comments[0].id))
+        chunks = [next(response.streaming_content) for _ in range(3)]
+        response.close()
+        self.assertIn(f'id: {comments[2].id}\n'.encode(), chunks[2])
+
+    def test_connection_limit(self):
+        """Сверх лимита подключений отвечаем 503."""
+        max_subscribers = broker.max_subscribers
+        broker.max_subscribers = 0
+        try:
+            response = self.guest_client.get(reverse('api:events'))
+        finally:
+            broker.max_subscribers = max_subscribers
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_changes_since(self):
+        """Опрос возвращает id постов новее курсора."""
+        newer = Post.objects.create(author=self.user, text='Новый')
+        response = self.guest_client.get(
+            reverse('api:changes'), {'since': self.post.id})
+        self.assertEqual(response.json()['ids'], [newer.id])
+
+    def test_follow_requires_login(self):
+        """Канал подписок доступен только авторизованным."""
+        response = self.guest_client.get(
+            reverse('api:changes'), {'channel': 'follow'})
+        self.assertEqual(response.status_code, 401)
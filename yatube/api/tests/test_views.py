@@ -0,0 +1,158 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def read_json(response):
+    return json.loads(response.content)
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author',
+                                            first_name='Лев',
+                                            last_name='Толстой')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='description',
+        )
+        for i in range(15):
+            Post.objects.create(author=cls.user, text=f'Пост {i}',
+                                group=cls.group)
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.post = Post.objects.first()
+        for i in range(3):
+            Comment.objects.create(post=cls.post, author=cls.follower,
+                                   text=f'Комментарий {i}')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_follower = Client()
+        self.authorized_follower.force_login(self.follower)
+
+    def test_cursor_pagination(self):
+        """Курсор проходит по всем постам без повторов и пропусков."""
+        url = reverse('api:post_list')
+        ids = []
+        cursor = None
+        while True:
+            params = {'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            data = read_json(self.guest_client.get(url, params))
+            ids.extend(item['id'] for item in data['results'])
+            cursor = data['next']
+            if cursor is None:
+                break
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_sparse_fields(self):
+        """?fields= оставляет только запрошенные поля."""
+        response = self.guest_client.get(
+            reverse('api:post_list'), {'fields': 'id,text'})
+        item = read_json(response)['results'][0]
+        self.assertEqual(set(item), {'id', 'text'})
+
+    def test_unknown_field(self):
+        """Неизвестное поле - ошибка 400."""
+        response = self.guest_client.get(
+            reverse('api:post_list'), {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_expand_batched(self):
+        """Авторы и группы раскрываются одним запросом на модель."""
+        url = reverse('api:group_post_list', args=(self.group.slug,))
+        with self.assertNumQueries(4):
+            response = self.guest_client.get(
+                url, {'expand': 'author,group', 'limit': 10})
+            item = read_json(response)['results'][0]
+        self.assertEqual(item['author']['full_name'], 'Лев Толстой')
+        self.assertEqual(item['group']['slug'], self.group.slug)
+
+    def test_etag(self):
+        """Повторный запрос с If-None-Match получает 304."""
+        url = reverse('api:profile_post_list', args=(self.user.username,))
+        response = self.guest_client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_follow_feed(self):
+        """Лента подписок только для авторизованных."""
+        url = reverse('api:follow_post_list')
+        self.assertEqual(self.guest_client.get(url).status_code, 401)
+        response = self.authorized_follower.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(len(read_json(response)['results']), 10)
+
+    def test_comments_in_order(self):
+        """Комментарии отдаются от старых к новым."""
+        response = self.guest_client.get(
+            reverse('api:comment_list', args=(self.post.id,)))
+        texts = [item['text'] for item in read_json(response)['results']]
+        self.assertEqual(texts, [f'Комментарий {i}' for i in range(3)])
+
+
+class PostBatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        Comment.objects.create(post=cls.posts[0], author=cls.user,
+                               text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('api:post_batch')
+
+    def test_order_and_misses(self):
+        """Посты в порядке запроса, отсутствующие помечены."""
+        ids = [self.posts[2].id, 999, self.posts[0].id]
+        response = self.guest_client.get(
+            self.url, {'ids': ','.join(map(str, ids))})
+        data = response.json()
+        self.assertEqual(data['results'][0]['id'], self.posts[2].id)
+        self.assertIsNone(data['results'][1])
+        self.assertEqual(data['results'][2]['comment_count'], 1)
+        self.assertEqual(data['missing'], [999])
+
+    def test_single_query_then_cache(self):
+        """Промахи читаются одним запросом, повтор берётся из кэша."""
+        ids = ','.join(str(post.id) for post in self.posts)
+        with self.assertNumQueries(1):
+            self.guest_client.get(self.url, {'ids': ids})
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.url, {'ids': ids})
+
+    def test_comment_invalidates_cache(self):
+        """Новый комментарий сбрасывает кэш поста."""
+        post = self.posts[1]
+        self.guest_client.get(self.url, {'ids': post.id})
+        Comment.objects.create(post=post, author=self.user, text='Новый')
+        data = self.guest_client.get(self.url, {'ids': post.id}).json()
+        self.assertEqual(data['results'][0]['comment_count'], 1)
+
+    def test_too_many_ids(self):
+        """Слишком длинный список id - ошибка 400."""
+        ids = ','.join(str(pk) for pk in range(1, 102))
+        response = self.guest_client.get(self.url, {'ids': ids})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,19 @@
+from django.urls import path
+
+from . import events, views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.post_list, name='post_list'),
+    path('posts/batch/', views.post_batch, name='post_batch'),
+    path('posts/<int:post_id>/comments/',
+         views.comment_list, name='comment_list'),
+    path('groups/<slug:slug>/posts/',
+         views.group_post_list, name='group_post_list'),
+    path('profiles/<str:username>/posts/',
+         views.profile_post_list, name='profile_post_list'),
+    path('follow/posts/', views.follow_post_list, name='follow_post_list'),
+    path('events/', events.events, name='events'),
+    path('changes/', events.changes, name='changes'),
+]
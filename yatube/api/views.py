@@ -0,0 +1,129 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from posts.models import Comment, Group, Post, User
+from posts.utils import paginate_after
+from . import serializers
+from .cache import get_posts
+
+
+def error(message, status=400):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit должен быть числом')
+    return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+
+def page_response(request, queryset, allowed, order_field, descending=True,
+                  private=False):
+    """Отдаёт страницу объектов после ?cursor= в JSON.
+
+    Каждый объект кодируется один раз; из тех же строк считается ETag,
+    поэтому повторный запрос с If-None-Match получает 304. Страница
+    ограничена API_MAX_PAGE_SIZE и всё равно целиком нужна для ETag,
+    поэтому отдаётся обычным ответом, а не потоком.
+    """
+    try:
+        fields = serializers.parse_fields(request, allowed)
+        expand = serializers.parse_expand(request, fields)
+        projection = serializers.get_projection(
+            fields, allowed, ('id', order_field))
+        objects, next_cursor = paginate_after(
+            queryset.only(*projection), request.GET.get('cursor'),
+            get_limit(request), field=order_field, descending=descending)
+    except ValueError as exc:
+        return error(str(exc))
+
+    related = serializers.load_related(objects, expand)
+    items = [
+        serializers.encode(serializers.serialize(obj, fields, related))
+        for obj in objects
+    ]
+    digest = hashlib.md5()
+    for item in items:
+        digest.update(item.encode())
+    digest.update(str(next_cursor).encode())
+    etag = quote_etag(digest.hexdigest())
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            ''.join(serializers.encode_page(items, next_cursor)),
+            content_type='application/json')
+    response['ETag'] = etag
+    if private:
+        patch_cache_control(response, private=True, max_age=0)
+    else:
+        patch_cache_control(response, public=True,
+                            max_age=settings.API_CACHE_MAX_AGE)
+    return response
+
+
+@require_GET
+def post_list(request):
+    return page_response(request, Post.objects.all(),
+                         serializers.POST_FIELDS, 'pub_date')
+
+
+@require_GET
+def group_post_list(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return page_response(request, group.posts.all(),
+                         serializers.POST_FIELDS, 'pub_date')
+
+
+@require_GET
+def profile_post_list(request, username):
+    author = get_object_or_404(User, username=username)
+    return page_response(request, author.posts.all(),
+                         serializers.POST_FIELDS, 'pub_date')
+
+
+@require_GET
+def follow_post_list(request):
+    if not request.user.is_authenticated:
+        return error('Требуется авторизация', status=401)
+    posts = Post.objects.filter(author__following__user=request.user)
+    return page_response(request, posts, serializers.POST_FIELDS,
+                         'pub_date', private=True)
+
+
+@require_GET
+def comment_list(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    return page_response(request, Comment.objects.filter(post=post),
+                         serializers.COMMENT_FIELDS, 'created',
+                         descending=False)
+
+
+@require_GET
+def post_batch(request):
+    """Посты по списку ?ids= в порядке запроса, ненайденные - null."""
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError:
+        return error('ids должны быть числами')
+    if not ids:
+        return error('Не переданы ids')
+    if len(ids) > settings.API_BATCH_MAX_IDS:
+        return error(f'Не больше {settings.API_BATCH_MAX_IDS} ids за запрос')
+
+    found = get_posts(ids)
+    response = JsonResponse({
+        'results': [found.get(pk) for pk in ids],
+        'missing': [pk for pk in ids if pk not in found],
+    }, json_dumps_params={'ensure_ascii': False})
+    patch_cache_control(response, public=True,
+                        max_age=settings.API_CACHE_MAX_AGE)
+    return response
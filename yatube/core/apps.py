@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .auth import invalidate_cached_user
+        from .db import set_sqlite_pragmas
+
+        connection_created.connect(set_sqlite_pragmas)
+        post_save.connect(invalidate_cached_user,
+                          sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(invalidate_cached_user,
+                            sender=settings.AUTH_USER_MODEL)
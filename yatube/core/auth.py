@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY, get_user_model, load_backend)
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+USER_KEY = 'auth-user:{pk}:{version}'
+USER_VERSION_KEY = 'auth-user-version:{pk}'
+
+
+def get_user_version(pk):
+    key = USER_VERSION_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Меняет версию пользователя, старая копия в кэше больше не читается."""
+    key = USER_VERSION_KEY.format(pk=instance.pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_cached_user(request):
+    """То же, что django.contrib.auth.get_user, но пользователь из кэша."""
+    try:
+        user_id = get_user_model()._meta.pk.to_python(
+            request.session[SESSION_KEY])
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    key = USER_KEY.format(pk=user_id, version=get_user_version(user_id))
+    user = cache.get(key)
+    if user is None:
+        user = load_backend(backend_path).get_user(user_id)
+        if user is None:
+            return AnonymousUser()
+        cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        request.session.flush()
+        return AnonymousUser()
+    return user
@@ -0,0 +1,44 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+LOCKED_ERRORS = ('database is locked', 'database table is locked')
+
+
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite (WAL, busy_timeout и т.д.)."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(error):
+    message = str(error).lower()
+    return any(text in message for text in LOCKED_ERRORS)
+
+
+def atomic_write(func, *args, **kwargs):
+    """Выполняет короткую запись в транзакции с повтором при блокировке.
+
+    Между попытками ждёт с экспоненциальной задержкой и случайным
+    разбросом, чтобы конкурирующие запросы не просыпались одновременно.
+    Внутри уже открытой транзакции повтор невозможен, поэтому там
+    функция просто вызывается как есть.
+    """
+    if connection.in_atomic_block:
+        return func(*args, **kwargs)
+    attempts = settings.WRITE_RETRY_ATTEMPTS
+    delay = settings.WRITE_RETRY_DELAY
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                return func(*args, **kwargs)
+        except OperationalError as error:
+            if not is_locked_error(error) or attempt == attempts - 1:
+                raise
+        time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
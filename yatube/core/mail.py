@@ -0,0 +1,130 @@
+import email
+import uuid
+from datetime import timedelta
+from email.utils import getaddresses
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.utils import timezone
+
+from .db import atomic_write
+from .models import OutboxMessage
+
+
+class StoredMIME(MIMEMixin, email.message.Message):
+    """Разобранное письмо из очереди с as_bytes(linesep=...) для бэкендов."""
+
+
+class StoredMessage(EmailMessage):
+    """Письмо из очереди: готовый MIME и адреса конверта.
+
+    В очереди хранятся байты MIME, а не pickle объекта EmailMessage:
+    pickle может не загрузиться после обновления кода или Django.
+    """
+
+    def __init__(self, row):
+        super().__init__(
+            subject=row.subject, from_email=row.from_email,
+            to=[address for _, address in getaddresses([row.recipients])])
+        self.payload = bytes(row.payload)
+
+    def message(self):
+        return email.message_from_bytes(self.payload, _class=StoredMIME)
+
+
+def to_outbox(message):
+    return OutboxMessage(
+        subject=message.subject[:255],
+        recipients=', '.join(message.recipients()),
+        from_email=message.from_email,
+        payload=message.message().as_bytes(),
+    )
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Складывает письма в таблицу OutboxMessage вместо отправки.
+
+    Запрос не ждёт почтовый сервер: письма отправляет send_outbox через
+    OUTBOX_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        rows = [to_outbox(message) for message in email_messages
+                if message.recipients()]
+        if rows:
+            atomic_write(OutboxMessage.objects.bulk_create, rows)
+        return len(rows)
+
+
+def claim(batch_size):
+    """Забирает до batch_size готовых писем, чтобы их не взял другой процесс.
+
+    Взятые письма получают метку lease и откладываются на OUTBOX_LEASE
+    секунд: если отправитель упадёт, их подхватят после этого срока.
+    """
+    now = timezone.now()
+    lease = uuid.uuid4().hex
+    ids = list(
+        OutboxMessage.objects.filter(
+            sent__isnull=True,
+            next_attempt__lte=now,
+            attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+        ).values_list('pk', flat=True)[:batch_size])
+    OutboxMessage.objects.filter(pk__in=ids, next_attempt__lte=now).update(
+        lease=lease,
+        next_attempt=now + timedelta(seconds=settings.OUTBOX_LEASE))
+    return list(OutboxMessage.objects.filter(lease=lease))
+
+
+def retry_later(row, error):
+    row.last_error = f'{type(error).__name__}: {error}'
+    row.next_attempt = timezone.now() + timedelta(
+        seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (row.attempts - 1))
+
+
+def deliver(batch_size=None, connection=None):
+    """Отправляет одну порцию писем через одно соединение.
+
+    Неудачные попытки повторяются с экспоненциальной задержкой, после
+    OUTBOX_MAX_ATTEMPTS письмо остаётся в таблице с последней ошибкой.
+    Если не удалось подключиться к почтовому серверу, так же
+    откладывается вся порция. Возвращает (отправлено, с ошибкой).
+    """
+    batch = atomic_write(claim, batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection(
+        settings.OUTBOX_EMAIL_BACKEND, fail_silently=False)
+    for row in batch:
+        row.attempts += 1
+        row.lease = ''
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as error:
+        for row in batch:
+            retry_later(row, error)
+        failed = len(batch)
+    else:
+        try:
+            for row in batch:
+                try:
+                    connection.send_messages([StoredMessage(row)])
+                except Exception as error:
+                    failed += 1
+                    retry_later(row, error)
+                else:
+                    sent += 1
+                    row.sent = timezone.now()
+                    row.last_error = ''
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                # письма уже отправлены, ошибка при отключении не важна
+                pass
+    atomic_write(OutboxMessage.objects.bulk_update, batch, [
+        'attempts', 'lease', 'last_error', 'next_attempt', 'sent'])
+    return sent, failed
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutboxMessage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--loop', type=float, default=None, metavar='SECONDS',
+            help='Не выходить, а проверять очередь с этим интервалом')
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = deliver(options['batch_size'])
+                if not sent and not failed:
+                    break
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if options['loop'] is None:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Готово, отправлено: {total_sent}, '
+                    f'ошибок: {total_failed}'))
+                return
+            time.sleep(options['loop'])
@@ -0,0 +1,62 @@
+import zlib
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.middleware.gzip import GZipMiddleware as BaseGZipMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from .auth import get_cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Берёт пользователя запроса из кэша вместо запроса к auth_user.
+
+    Только при общем кэше (SHARED_CACHE): иначе смена пароля или
+    блокировка не сбросит копию пользователя в других процессах.
+    """
+
+    def process_request(self, request):
+        if not settings.SHARED_CACHE:
+            return super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+def compress_sequence(sequence):
+    """Сжимает части потока в gzip, сбрасывая компрессор после каждой.
+
+    django.utils.text.compress_sequence копит сжатое до конца потока, и
+    начало страницы из core.streaming не доходило до браузера раньше
+    остального; Z_SYNC_FLUSH отдаёт каждую часть сразу.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for item in sequence:
+        if item:
+            yield compressor.compress(item) + compressor.flush(
+                zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+class GZipMiddleware(BaseGZipMiddleware):
+    """Сжимает текстовые ответы не короче GZIP_MIN_LENGTH байт.
+
+    Потоковые ответы сжимаются по частям, и каждая часть уходит клиенту
+    сразу; события SSE не сжимаются, иначе они застревают в буфере
+    компрессора.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (content_type.startswith('text/event-stream')
+                or not content_type.startswith(settings.GZIP_CONTENT_TYPES)):
+            return response
+        if not response.streaming:
+            if len(response.content) < settings.GZIP_MIN_LENGTH:
+                return response
+            return super().process_response(request, response)
+        if response.has_header('Content-Encoding'):
+            return response
+        content = response.streaming_content
+        response = super().process_response(request, response)
+        if response.get('Content-Encoding') == 'gzip':
+            response.streaming_content = compress_sequence(content)
+        return response
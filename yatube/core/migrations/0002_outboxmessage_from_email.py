@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:01
+
+import pickle
+
+from django.db import migrations, models
+
+
+def unpickle_payloads(apps, schema_editor):
+    """Переводит неотправленные письма из pickle в MIME."""
+    OutboxMessage = apps.get_model('core', 'OutboxMessage')
+    messages = list(OutboxMessage.objects.filter(sent__isnull=True))
+    for row in messages:
+        message = pickle.loads(bytes(row.payload))
+        row.from_email = message.from_email
+        row.payload = message.message().as_bytes()
+    OutboxMessage.objects.bulk_update(messages, ['from_email', 'payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='from_email',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(unpickle_payloads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ждущее отправки командой send_outbox (см. core.mail)."""
+    subject = models.CharField(max_length=255)
+    recipients = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    # готовое письмо в формате MIME со всеми вложениями и заголовками
+    payload = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    lease = models.CharField(max_length=32, blank=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt', 'id']
+        indexes = [
+            models.Index(fields=['sent', 'next_attempt'],
+                         name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients}'
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator для админки больших таблиц без полного COUNT(*).
+
+    Без фильтров число строк оценивается по наибольшему id, с фильтрами
+    считается не дальше ADMIN_COUNT_LIMIT строк. Если строки удалялись,
+    оценка завышена: неполная страница даёт точное число строк, а вместо
+    пустой страницы за концом списка отдаётся последняя настоящая.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return queryset.model._default_manager.aggregate(
+                last=Max('pk'))['last'] or 0
+        return queryset[:settings.ADMIN_COUNT_LIMIT].count()
+
+    def page(self, number):
+        page = super().page(number)
+        rows = len(page.object_list)
+        if rows == self.per_page:
+            return page
+        if rows or page.number == 1:
+            count = (page.number - 1) * self.per_page + rows
+        else:
+            count = self.object_list.count()
+        if count == self.count:
+            return page
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        if rows or page.number == 1:
+            return page
+        return super().page(self.num_pages)
@@ -0,0 +1,80 @@
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+
+class Subscription:
+    """Очередь событий одного подписчика ограниченного размера.
+
+    Если подписчик не успевает читать и очередь переполнилась, новые
+    события отбрасываются, а overflowed сообщает, что клиенту нужно
+    догнать изменения через опрос.
+    """
+
+    __slots__ = ('channels', 'queue', 'overflowed')
+
+    def __init__(self, channels, queue_size):
+        self.channels = tuple(channels)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Следующее событие или None, если за timeout ничего не пришло."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class Broker:
+    """Внутрипроцессный pub/sub по именованным каналам."""
+
+    def __init__(self, max_subscribers, queue_size):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.channels = defaultdict(set)
+        self.count = 0
+
+    def subscribe(self, channels):
+        """Новая подписка или None, если достигнут лимит подписчиков."""
+        with self.lock:
+            if self.count >= self.max_subscribers:
+                return None
+            subscription = Subscription(channels, self.queue_size)
+            for channel in subscription.channels:
+                self.channels[channel].add(subscription)
+            self.count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.channels.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[channel]
+            self.count -= 1
+
+    def publish(self, channels, event):
+        """Доставляет событие каждому подписчику каналов один раз."""
+        with self.lock:
+            subscribers = set()
+            for channel in channels:
+                subscribers.update(self.channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+broker = Broker(max_subscribers=settings.SSE_MAX_CONNECTIONS,
+                queue_size=settings.SSE_QUEUE_SIZE)
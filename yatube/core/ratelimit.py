@@ -0,0 +1,65 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .views import too_many_requests
+
+KEY = 'rl:{scope}:{ident}:{window}'
+
+
+def get_ident(request):
+    """Пользователь для авторизованных, иначе IP-адрес клиента."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'u{user.pk}'
+    return 'ip' + request.META.get('REMOTE_ADDR', '')
+
+
+def hit(scope, ident, limit, period, now=None):
+    """Учитывает запрос и возвращает 0 или сколько секунд ждать.
+
+    Скользящее окно приближается двумя фиксированными: счётчик прошлого
+    окна учитывается с весом оставшейся доли текущего. Счётчики живут в
+    кэше и увеличиваются атомарным incr.
+    """
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    key = KEY.format(scope=scope, ident=ident, window=int(window))
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # ключа нет: создаём, а если опередил другой запрос - увеличиваем
+        if cache.add(key, 1, period * 2):
+            count = 1
+        else:
+            count = cache.incr(key)
+    if count <= limit:
+        previous = cache.get(KEY.format(
+            scope=scope, ident=ident, window=int(window) - 1), 0)
+        if previous * (1 - elapsed / period) + count <= limit:
+            return 0
+    return max(1, math.ceil(period - elapsed))
+
+
+def ratelimit(scope, methods=('POST',)):
+    """Ограничивает частоту запросов к view политикой RATELIMITS[scope].
+
+    Считаются только запросы с методами из methods (None - все).
+    Сверх лимита отвечает 429 с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            policy = settings.RATELIMITS.get(scope)
+            if (settings.RATELIMIT_ENABLED and policy
+                    and (methods is None or request.method in methods)):
+                limit, period = policy
+                retry_after = hit(scope, get_ident(request), limit, period)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,44 @@
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+STREAM_MARKER = '<!-- stream -->'
+
+
+def render_stream(request, template_name, context, items, item_template,
+                  item_name, separator='', end_template=None,
+                  end_context=None):
+    """Отдаёт страницу потоком: начало, элементы items по одному, конец.
+
+    Шаблон страницы при streaming выводит {{ stream_marker }} вместо
+    цикла по items. Сама страница рендерится сразу, чтобы csrf_token и
+    ошибки шаблона обработались до ответа; потом рендерятся только
+    элементы, и браузер получает <head> и шапку, не дожидаясь их.
+    items обходится уже после отправки начала, поэтому queryset или
+    страницу пагинатора лучше передавать без list().
+
+    То, что известно только после обхода items (курсор следующей
+    страницы), выводит end_template сразу за элементами: он рендерится
+    с context, дополненным словарём end_context().
+    """
+    page = render_to_string(template_name, {
+        **context,
+        'streaming': True,
+        'stream_marker': mark_safe(STREAM_MARKER),
+    }, request)
+    head, marker, tail = page.partition(STREAM_MARKER)
+
+    def chunks():
+        yield head
+        if marker:
+            template = get_template(item_template)
+            for index, item in enumerate(items):
+                html = template.render({item_name: item}, request)
+                yield separator + html if index else html
+            if end_template:
+                yield get_template(end_template).render(
+                    {**context, **(end_context() if end_context else {})},
+                    request)
+        yield tail
+
+    return StreamingHttpResponse(chunks())
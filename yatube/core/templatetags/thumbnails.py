@@ -0,0 +1,26 @@
+import logging
+
+from django import template
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+@register.simple_tag
+def post_thumbnail(image):
+    """Миниатюра картинки поста по POST_THUMBNAIL_GEOMETRY и _OPTIONS.
+
+    Без картинки или при ошибке - None, как у {% thumbnail %} из sorl.
+    """
+    if not image:
+        return None
+    try:
+        return get_thumbnail(image, settings.POST_THUMBNAIL_GEOMETRY,
+                             **settings.POST_THUMBNAIL_OPTIONS)
+    except Exception:
+        if getattr(settings, 'THUMBNAIL_DEBUG', False):
+            raise
+        logger.exception('Не удалось создать миниатюру %s', image)
+        return None
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+
+
+@override_settings(
+    SHARED_CACHE=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class CachedUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cached',
+                                            password='pass-1234')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_no_queries_for_logged_in_user(self):
+        """Сессия и пользователь берутся из кэша без запросов к базе."""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(url)
+        self.assertTrue(response.context['user'].is_authenticated)
+
+    def test_user_change_invalidates_cache(self):
+        """После изменения пользователя в запрос попадает новая версия."""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля завершает сессии со старым хэшем."""
+        url = reverse('about:author')
+        self.authorized_client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('pass-5678')
+        user.save()
+        response = self.authorized_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class LocalCacheAuthTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='local')
+
+    @override_settings(SHARED_CACHE=False)
+    def test_user_from_db_without_shared_cache(self):
+        """Без общего кэша пользователь читается из базы на каждый запрос."""
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('about:author')
+        client.get(url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
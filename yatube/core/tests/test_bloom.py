@@ -0,0 +1,16 @@
+from django.test import SimpleTestCase
+
+from ..bloom import BloomFilter
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives(self):
+        """Добавленные ключи всегда находятся, лишних - около error_rate."""
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for number in range(1000):
+            bloom.add(f'user{number}')
+        self.assertTrue(all(f'user{number}' in bloom
+                            for number in range(1000)))
+        false_positives = sum(f'other{number}' in bloom
+                              for number in range(10000))
+        self.assertLess(false_positives, 300)
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..db import atomic_write
+
+
+class SqlitePragmasTest(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение получает busy_timeout из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+            cursor.execute('PRAGMA synchronous')
+            # 1 - NORMAL
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+@override_settings(WRITE_RETRY_ATTEMPTS=3, WRITE_RETRY_DELAY=0)
+class AtomicWriteTest(TransactionTestCase):
+    def test_retry_on_locked(self):
+        """Запись повторяется, пока база заблокирована."""
+        func = mock.Mock(side_effect=[
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+            'ok',
+        ])
+        self.assertEqual(atomic_write(func, 1, key='value'), 'ok')
+        self.assertEqual(func.call_count, 3)
+        func.assert_called_with(1, key='value')
+
+    def test_gives_up_after_attempts(self):
+        """После исчерпания попыток ошибка пробрасывается наружу."""
+        func = mock.Mock(side_effect=OperationalError('database is locked'))
+        with self.assertRaises(OperationalError):
+            atomic_write(func)
+        self.assertEqual(func.call_count, 3)
+
+    def test_other_errors_not_retried(self):
+        """Прочие ошибки базы не повторяются."""
+        func = mock.Mock(side_effect=OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            atomic_write(func)
+        self.assertEqual(func.call_count, 1)
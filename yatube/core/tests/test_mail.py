@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..mail import deliver
+from ..models import OutboxMessage
+
+User = get_user_model()
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('Соединение отклонено')
+
+    def send_messages(self, messages):
+        raise AssertionError('Соединение не открыто')
+
+
+class FailingBackend(BaseEmailBackend):
+    opened = 0
+
+    def open(self):
+        FailingBackend.opened += 1
+
+    def send_messages(self, messages):
+        raise ConnectionError('Почтовый сервер недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+class OutboxTest(TestCase):
+    def send(self, count=1):
+        for i in range(count):
+            mail.send_mail(f'Тема {i}', 'Текст', 'from@example.com',
+                           [f'user{i}@example.com'])
+
+    def test_send_mail_only_enqueues(self):
+        """send_mail пишет в очередь и ничего не отправляет."""
+        self.send()
+        self.assertEqual(len(mail.outbox), 0)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.recipients, 'user0@example.com')
+        self.assertIsNone(message.sent)
+
+    def test_payload_is_mime(self):
+        """В очереди лежит MIME письма; скрытые копии и вложения доходят."""
+        message = mail.EmailMessage('Тема', 'Текст', 'from@example.com',
+                                    ['to@example.com'],
+                                    bcc=['hidden@example.com'])
+        message.attach('notes.txt', 'Заметки', 'text/plain')
+        message.send()
+        row = OutboxMessage.objects.get()
+        self.assertTrue(bytes(row.payload).startswith(b'Content-Type:'))
+        self.assertEqual(deliver(), (1, 0))
+        sent = mail.outbox[0]
+        self.assertEqual(sent.recipients(),
+                         ['to@example.com', 'hidden@example.com'])
+        self.assertEqual(sent.from_email, 'from@example.com')
+        text = sent.message().as_bytes(linesep='\r\n').decode()
+        self.assertIn('notes.txt', text)
+        self.assertNotIn('hidden@example.com', text)
+
+    def test_password_reset_enqueued(self):
+        """Письмо сброса пароля тоже уходит через очередь."""
+        User.objects.create_user(username='user', email='user@example.com',
+                                 password='password')
+        Client().post(reverse('password_reset'),
+                      {'email': 'user@example.com'})
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_deliver_batch(self):
+        """Команда отправляет очередь порциями и отмечает письма."""
+        self.send(3)
+        out = StringIO()
+        call_command('send_outbox', '--batch-size', '2', stdout=out)
+        self.assertEqual(sorted(message.subject for message in mail.outbox),
+                         ['Тема 0', 'Тема 1', 'Тема 2'])
+        self.assertIn('отправлено: 3', out.getvalue())
+        self.assertFalse(OutboxMessage.objects.filter(sent__isnull=True)
+                         .exists())
+        self.assertEqual(deliver(), (0, 0))
+
+    @override_settings(OUTBOX_EMAIL_BACKEND=__name__ + '.FailingBackend')
+    def test_retry_with_backoff(self):
+        """Ошибка откладывает письмо, после лимита попыток оно не берётся."""
+        self.send(2)
+        FailingBackend.opened = 0
+        self.assertEqual(deliver(), (0, 2))
+        self.assertEqual(FailingBackend.opened, 1)
+        message = OutboxMessage.objects.first()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('ConnectionError', message.last_error)
+        self.assertGreater(message.next_attempt, timezone.now())
+        self.assertEqual(deliver(), (0, 0))
+        OutboxMessage.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver(), (0, 2))
+        OutboxMessage.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver(), (0, 0))
+
+    @override_settings(OUTBOX_EMAIL_BACKEND=__name__ + '.UnreachableBackend')
+    def test_server_unreachable(self):
+        """Без почтового сервера порция откладывается, команда не падает."""
+        self.send(2)
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertIn('ошибок: 2', out.getvalue())
+        for message in OutboxMessage.objects.all():
+            self.assertEqual(message.attempts, 1)
+            self.assertEqual(message.lease, '')
+            self.assertIn('ConnectionRefusedError', message.last_error)
+            self.assertGreater(message.next_attempt, timezone.now())
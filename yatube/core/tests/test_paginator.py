@@ -0,0 +1,32 @@
+from django.core.paginator import Paginator
+from django.test import SimpleTestCase
+
+from ..templatetags.paginator import page_window
+
+
+class PageWindowTest(SimpleTestCase):
+    def setUp(self):
+        self.paginator = Paginator(range(10000), 10)
+
+    def test_few_pages_shown_entirely(self):
+        """Если страниц мало, выводятся все номера."""
+        page = Paginator(range(50), 10).page(3)
+        self.assertEqual(page_window(page), [1, 2, 3, 4, 5])
+
+    def test_window_in_the_middle(self):
+        """Вокруг текущей страницы окно, края через многоточие."""
+        page = self.paginator.page(500)
+        self.assertEqual(page_window(page),
+                         [1, None, 498, 499, 500, 501, 502, None, 1000])
+
+    def test_window_at_the_edges(self):
+        """У первой и последней страницы пропуск только с одной стороны."""
+        self.assertEqual(page_window(self.paginator.page(1)),
+                         [1, 2, 3, None, 1000])
+        self.assertEqual(page_window(self.paginator.page(1000)),
+                         [1, None, 998, 999, 1000])
+
+    def test_single_page_not_elided(self):
+        """Многоточие не заменяет одну-единственную страницу."""
+        self.assertEqual(page_window(self.paginator.page(5)),
+                         [1, 2, 3, 4, 5, 6, 7, None, 1000])
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from ..ratelimit import hit
+
+User = get_user_model()
+
+
+class HitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_and_retry_after(self):
+        """Сверх лимита hit возвращает время до конца окна."""
+        for _ in range(3):
+            self.assertEqual(hit('test', 'ip1', 3, 60, now=600), 0)
+        self.assertEqual(hit('test', 'ip1', 3, 60, now=615), 45)
+        self.assertEqual(hit('test', 'ip2', 3, 60, now=615), 0)
+
+    def test_sliding_window(self):
+        """Прошлое окно учитывается пропорционально оставшейся доле."""
+        for _ in range(4):
+            hit('test', 'ip1', 4, 60, now=600)
+        # в начале следующего окна прошлые 4 запроса ещё почти все в силе
+        self.assertTrue(hit('test', 'ip1', 4, 60, now=666))
+        # к концу окна их вес почти нулевой
+        self.assertEqual(hit('test', 'ip1', 4, 60, now=719), 0)
+
+
+@override_settings(RATELIMITS={'comment': (2, 60), 'post': (1, 60)})
+class RatelimitViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_too_many_comments(self):
+        """Третий комментарий за минуту получает 429 с Retry-After."""
+        url = reverse('posts:add_comment', args=(self.post.id,))
+        for i in range(2):
+            response = self.client.post(url, {'text': f'Комментарий {i}'})
+            self.assertEqual(response.status_code, 302)
+        response = self.client.post(url, {'text': 'Лишний'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_get_not_counted(self):
+        """Открытие формы не расходует лимит на создание поста."""
+        url = reverse('posts:post_create')
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.post(url, {'text': 'Пост'})
+        self.assertEqual(self.client.post(url, {'text': 'Ещё'}).status_code,
+                         429)
@@ -0,0 +1,123 @@
+import gzip
+import shutil
+import tempfile
+import zlib
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import GZipMiddleware
+from ..views import accepts_encoding, serve_static
+
+
+class CompressedStaticTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # каталог создаётся только при запуске этих тестов
+        cls.static_root = tempfile.mkdtemp()
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+        )
+        cls.static_settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.static_settings.disable()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.name = staticfiles_storage.stored_name('js/feed.js')
+
+    def test_hashed_name_and_gzip_copy(self):
+        """collectstatic пишет файл с хэшем и его .gz рядом."""
+        self.assertRegex(self.name, r'^js/feed\.[0-9a-f]{12}\.js$')
+        with staticfiles_storage.open(self.name) as original, \
+                staticfiles_storage.open(self.name + '.gz') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()),
+                             original.read())
+
+    def test_serve_precompressed_immutable(self):
+        """Хэшированный файл отдаётся сжатым и кэшируется навсегда."""
+        request = RequestFactory().get(
+            '/static/' + self.name, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = serve_static(request, self.name)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('javascript', response['Content-Type'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_serve_refused_encoding(self):
+        """Кодировка с q=0 или лишь похожая по имени не выбирается."""
+        for header in ('gzip;q=0, deflate', 'x-gzip', '*;q=0', ''):
+            with self.subTest(header=header):
+                request = RequestFactory().get(
+                    '/static/' + self.name, HTTP_ACCEPT_ENCODING=header)
+                response = serve_static(request, self.name)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_accepts_encoding(self):
+        """Разбор Accept-Encoding по токенам и весам q."""
+        self.assertTrue(accepts_encoding('deflate, GZIP;q=0.5', 'gzip'))
+        self.assertTrue(accepts_encoding('br;q=0, *', 'gzip'))
+        self.assertFalse(accepts_encoding('br;q=0, *', 'br'))
+        self.assertFalse(accepts_encoding('gzip; q=0.000', 'gzip'))
+        self.assertFalse(accepts_encoding('gzip;q=abc', 'gzip'))
+
+    def test_serve_plain_without_hash(self):
+        """Файл без хэша кэшируется ненадолго и не сжимается без запроса."""
+        response = serve_static(RequestFactory().get('/'), 'js/feed.js')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+@override_settings(GZIP_MIN_LENGTH=300)
+class GZipMiddlewareTest(SimpleTestCase):
+    def process(self, response):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        return GZipMiddleware().process_response(request, response)
+
+    def test_threshold(self):
+        """Короткие ответы не сжимаются, длинные - сжимаются."""
+        self.assertFalse(self.process(HttpResponse('a' * 299))
+                         .has_header('Content-Encoding'))
+        self.assertEqual(self.process(HttpResponse('a' * 300))
+                         ['Content-Encoding'], 'gzip')
+
+    def test_skips_binary_and_event_stream(self):
+        """Картинки и события SSE отдаются как есть."""
+        image = HttpResponse(b'a' * 1000, content_type='image/png')
+        events = StreamingHttpResponse(iter(['data: 1\n\n']),
+                                       content_type='text/event-stream')
+        for response in (image, events):
+            with self.subTest(content_type=response['Content-Type']):
+                self.assertFalse(self.process(response)
+                                 .has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        """Потоковый ответ сжимается по частям."""
+        response = self.process(StreamingHttpResponse(
+            iter(['{"results": [', '1', ']}']),
+            content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response)),
+                         b'{"results": [1]}')
+
+    def test_streaming_parts_sent_early(self):
+        """Каждая часть потока сжимается и уходит, не дожидаясь конца."""
+        response = self.process(StreamingHttpResponse(
+            iter(['<head>', '<p>1</p>', '<p>2</p>']),
+            content_type='text/html'))
+        chunks = list(response)
+        self.assertGreater(len([chunk for chunk in chunks[:-1] if chunk]), 1)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.assertEqual(decompressor.decompress(chunks[0]), b'<head>')
+        self.assertEqual(gzip.decompress(b''.join(chunks)),
+                         b'<head><p>1</p><p>2</p>')
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from ..warmup import precompile_templates
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class PrecompileTemplatesTest(SimpleTestCase):
+    def test_templates_cached(self):
+        """Все шаблоны проекта попадают в кэш загрузчика."""
+        names = [name for name, _ in precompile_templates()]
+        for name in ('base.html', 'includes/header.html',
+                     'posts/paginator.html', 'admin/base.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('posts/index.html', loader.get_template_cache)
@@ -0,0 +1,70 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import Comment, Post
+from ..db import atomic_write
+from ..writer import SingleWriter
+
+User = get_user_model()
+
+
+class SingleWriterTest(TransactionTestCase):
+    def setUp(self):
+        self.writer = SingleWriter(batch_size=10)
+        self.user = User.objects.create_user(username='writer')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+
+    def test_concurrent_writes(self):
+        """Записи из разных потоков выполняются и возвращают результат."""
+        results = []
+
+        def write(number):
+            results.append(self.writer.submit(
+                Comment.objects.create,
+                post=self.post, author=self.user, text=str(number)))
+
+        threads = [threading.Thread(target=write, args=(number,))
+                   for number in range(30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 30)
+        self.assertEqual(Comment.objects.count(), 30)
+
+    def test_error_returned_to_caller(self):
+        """Ошибка задачи уходит её автору и не откатывает остальные."""
+        batch = [
+            (None, Comment.objects.create,
+             (), {'post': self.post, 'author': self.user, 'text': 'ok'}),
+            (None, Comment.objects.create, (), {'post': self.post}),
+        ]
+        outcomes = self.writer.apply(batch)
+        self.assertIsNone(outcomes[0][1])
+        self.assertIsNotNone(outcomes[1][1])
+        self.assertEqual(Comment.objects.count(), 1)
+
+    @override_settings(WRITE_RETRY_DELAY=0)
+    def test_locked_batch_retried(self):
+        """Блокировка повторяет всю пачку, а не отдаётся задаче ошибкой."""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        batch = [
+            (None, Comment.objects.create,
+             (), {'post': self.post, 'author': self.user, 'text': 'ok'}),
+            (None, flaky, (), {}),
+        ]
+        outcomes = atomic_write(self.writer.apply, batch)
+        self.assertEqual([error for _, error in outcomes], [None, None])
+        self.assertEqual(outcomes[1][0], 'ok')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(Comment.objects.count(), 1)
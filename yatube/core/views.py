@@ -1,10 +1,46 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.safestring import mark_safe
+from django.views.static import serve
+
+# Имя с хэшем содержимого от ManifestStaticFilesStorage: logo.0123abcd4567.png
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+NOT_FOUND_KEY = 'core:404-body'
+PATH_MARKER = '<!-- path -->'
 
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
 
 
+def not_found(request):
+    """404 без рендера шаблона для анонимных посетителей.
+
+    core/404.html рендерится один раз с меткой вместо адреса и хранится
+    в кэше; авторизованным шапка нужна своя, им страница рендерится.
+    """
+    if request.user.is_authenticated:
+        return page_not_found(request, None)
+    body = cache.get(NOT_FOUND_KEY)
+    if body is None:
+        body = render_to_string(
+            'core/404.html', {'path': mark_safe(PATH_MARKER)}, request)
+        cache.set(NOT_FOUND_KEY, body, settings.NOT_FOUND_CACHE_TIMEOUT)
+    return HttpResponse(body.replace(PATH_MARKER, escape(request.path)),
+                        status=404)
+
+
 def server_error(request):
     return render(request, 'core/500.html', status=500)
 
@@ -13,5 +49,63 @@ def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
 
 
+def too_many_requests(request, retry_after):
+    response = render(request, 'core/429.html',
+                      {'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def accepts_encoding(header, name):
+    """Принимает ли клиент кодировку name по заголовку Accept-Encoding.
+
+    Кодировка с q=0 запрещена; не названная явно берётся из *.
+    """
+    weights = {}
+    for part in header.split(','):
+        token, *params = part.split(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+    return weights.get(name, weights.get('*', 0.0)) > 0
+
+
+def serve_static(request, path):
+    """Отдаёт статику из STATIC_ROOT, если перед Django нет веб-сервера.
+
+    Берёт готовый .br или .gz вариант, когда клиент его принимает;
+    файлы с хэшем в имени кэшируются навсегда.
+    """
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    served, encoding = path, None
+    for suffix, name in (('.br', 'br'), ('.gz', 'gzip')):
+        full_path = safe_join(settings.STATIC_ROOT, path + suffix)
+        if accepts_encoding(accepted, name) and os.path.isfile(full_path):
+            served, encoding = path + suffix, name
+            break
+    response = serve(request, served, document_root=settings.STATIC_ROOT)
+    if encoding:
+        response['Content-Encoding'] = encoding
+        content_type, _ = mimetypes.guess_type(path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME.search(path):
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=60 * 60 * 24 * 365)
+    else:
+        patch_cache_control(response, public=True,
+                            max_age=settings.STATIC_MAX_AGE)
+    return response
@@ -0,0 +1,40 @@
+import os
+import time
+
+from django.template import engines
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def get_template_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            yield from get_template_dirs(loader.loaders)
+        else:
+            yield from loader.get_dirs()
+
+
+def get_template_names(engine):
+    """Имена всех шаблонов, которые видят загрузчики движка."""
+    names = set()
+    for directory in get_template_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, filename)
+                    names.add(os.path.relpath(path, directory))
+    return sorted(names)
+
+
+def precompile_templates():
+    """Загружает все шаблоны, чтобы заполнить кэш cached.Loader.
+
+    Возвращает список пар (имя шаблона, время компиляции в секундах).
+    """
+    engine = engines['django'].engine
+    timings = []
+    for name in get_template_names(engine):
+        started = time.perf_counter()
+        engine.get_template(name)
+        timings.append((name, time.perf_counter() - started))
+    return timings
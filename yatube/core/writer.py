@@ -0,0 +1,93 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+from .db import atomic_write, is_locked_error
+
+
+class SingleWriter:
+    """Поток, который последовательно выполняет все записи в базу.
+
+    Запросы кладут задачи в очередь и ждут результат. Поток забирает
+    из очереди всё накопившееся (не больше batch_size задач) и выполняет
+    пачку в одной транзакции, каждую задачу - в своей точке сохранения,
+    чтобы ошибка одной не откатывала остальные. При 'database is locked'
+    пачка повторяется целиком: откатилась вся транзакция, и результаты
+    задач отдаются только после её коммита.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='single-writer', daemon=True)
+                self.thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Ставит запись в очередь и возвращает её результат."""
+        self.start()
+        future = Future()
+        self.queue.put((future, func, args, kwargs))
+        return future.result()
+
+    def take_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.take_batch()
+            try:
+                outcomes = atomic_write(self.apply, batch)
+            except Exception as error:
+                for future, *_ in batch:
+                    future.set_exception(error)
+                continue
+            for (future, *_), (result, error) in zip(batch, outcomes):
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    @staticmethod
+    def apply(batch):
+        outcomes = []
+        for _, func, args, kwargs in batch:
+            try:
+                with transaction.atomic():
+                    outcomes.append((func(*args, **kwargs), None))
+            except OperationalError as error:
+                if is_locked_error(error):
+                    # повторяется вся транзакция пачки в atomic_write
+                    raise
+                outcomes.append((None, error))
+            except Exception as error:
+                outcomes.append((None, error))
+        return outcomes
+
+
+writer = SingleWriter(batch_size=settings.WRITER_BATCH_SIZE)
+
+
+def run_write(func, *args, **kwargs):
+    """Выполняет запись сразу или через общий поток записи.
+
+    Режим выбирается настройкой SERIALIZED_WRITES.
+    """
+    if settings.SERIALIZED_WRITES:
+        return writer.submit(func, *args, **kwargs)
+    return atomic_write(func, *args, **kwargs)
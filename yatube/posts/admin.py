@@ -1,17 +1,106 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from .models import Post, Group
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Max
+
+from core.paginator import EstimatedCountPaginator
+from . import bulk
+from .choices import cached_groups
+from .models import Post, Group, User
 
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'description')
+    search_fields = ('title', 'slug')
+
+
+class PostChangeListForm(forms.ModelForm):
+    """Строка списка постов: группы берутся из кэша, а не запросом."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        field = self.fields['group']
+        field.widget = forms.Select()
+        field.queryset = cached_groups()
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(cached_groups(), required=False,
+                                   label='Группа')
+
+
+class EstimatedChangeList(ChangeList):
+    """Список, в котором EstimatedCountPaginator мог уточнить число строк."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_count = self.paginator.count
+        self.multi_page = self.result_count > self.list_per_page
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
+    # диапазоны дат идут по индексу (pub_date, id)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
     empty_value_display = '-пусто-'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group', 'delete_in_batches', 'delete_authors')
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """Текст ищется только среди ADMIN_SEARCH_WINDOW последних id:
+        LIKE по всей таблице прочитал бы её целиком."""
+        if not search_term:
+            return queryset, False
+        last = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        queryset = queryset.filter(
+            pk__gt=last - settings.ADMIN_SEARCH_WINDOW)
+        return super().get_search_results(request, queryset, search_term)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def move_to_group(self, request, queryset):
+        group_id = request.POST.get('group')
+        group = Group.objects.filter(pk=group_id).first() if group_id else None
+        moved = bulk.move_posts(queryset, group)
+        self.message_user(
+            request, f'Перенесено постов: {moved} в {group or "без группы"}')
+    move_to_group.short_description = 'Перенести в выбранную группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_in_batches(self, request, queryset):
+        deleted = bulk.delete_posts(queryset)
+        self.message_user(request, f'Удалено постов: {deleted}')
+    delete_in_batches.short_description = 'Удалить порциями'
+    delete_in_batches.allowed_permissions = ('delete',)
+
+    def delete_authors(self, request, queryset):
+        authors = User.objects.filter(
+            pk__in=queryset.values('author_id')).exclude(pk=request.user.pk)
+        deleted = bulk.delete_authors(authors)
+        self.message_user(
+            request,
+            'Удалено авторов: {authors}, постов: {posts}, '
+            'комментариев: {comments}'.format(**deleted))
+    delete_authors.short_description = 'Удалить авторов со всеми постами'
+    delete_authors.allowed_permissions = ('delete_authors',)
+
+    def has_delete_authors_permission(self, request):
+        return request.user.has_perm('auth.delete_user')
 
 
 admin.site.register(Group, GroupAdmin)
@@ -1,5 +1,33 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from .choices import invalidate_group_choices
+        from .missing import remember_saved
+        from .signals import (count_deleted_comment, count_new_comment,
+                              invalidate_post_card, invalidate_post_cards,
+                              notify_comment, notify_follow,
+                              posts_bulk_changed, publish_comment,
+                              publish_post, trend_comment, trend_follow,
+                              trend_post)
+
+        for signal in (post_save, post_delete):
+            signal.connect(invalidate_post_card, sender='posts.Post')
+            signal.connect(invalidate_group_choices, sender='posts.Group')
+        posts_bulk_changed.connect(invalidate_post_cards)
+        post_save.connect(publish_post, sender='posts.Post')
+        post_save.connect(publish_comment, sender='posts.Comment')
+        post_save.connect(count_new_comment, sender='posts.Comment')
+        post_delete.connect(count_deleted_comment, sender='posts.Comment')
+        post_save.connect(trend_post, sender='posts.Post')
+        post_save.connect(trend_comment, sender='posts.Comment')
+        post_save.connect(trend_follow, sender='posts.Follow')
+        post_save.connect(notify_comment, sender='posts.Comment')
+        post_save.connect(notify_follow, sender='posts.Follow')
+        for model in (settings.AUTH_USER_MODEL, 'posts.Group', 'posts.Post'):
+            post_save.connect(remember_saved, sender=model)
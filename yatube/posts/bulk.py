@@ -0,0 +1,164 @@
+"""Массовые операции над постами порциями по диапазонам id.
+
+Объекты не загружаются и сигналы моделей не срабатывают: строки
+меняются через update() и _raw_delete(), производные счётчики
+пересчитываются одним запросом на порцию, а слушателям отправляется
+posts_bulk_changed. Каждая порция пишется в своей короткой транзакции,
+поэтому SQLite не блокируется надолго.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from sorl.thumbnail import delete as delete_image
+
+from core.db import atomic_write
+from .models import Comment, Follow, FollowStats, Post
+from .signals import posts_bulk_changed
+
+# Файлы картинок удаляются в фоне, чтобы не держать транзакцию
+image_cleaner = ThreadPoolExecutor(max_workers=1)
+
+
+def id_ranges(queryset, batch_size):
+    """Границы (после id, до id включительно) порций queryset."""
+    last = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last).order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        yield last, ids[-1]
+        last = ids[-1]
+
+
+def in_batches(queryset, func, batch_size=None, progress=None):
+    """Применяет func к каждой порции queryset, возвращает сумму результатов.
+
+    progress(done) вызывается после каждой порции.
+    """
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    done = 0
+    for after, upto in id_ranges(queryset, batch_size):
+        batch = queryset.filter(pk__gt=after, pk__lte=upto)
+        done += atomic_write(func, batch)
+        if progress:
+            progress(done)
+    return done
+
+
+def raw_delete(model, pks):
+    """Удаляет строки model и каскадно связанные с ними без загрузки."""
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            continue
+        related = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': pks})
+        if relation.on_delete is models.CASCADE:
+            raw_delete(relation.related_model,
+                       list(related.values_list('pk', flat=True)))
+        elif relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise ValueError(
+                f'Неподдерживаемый on_delete у {relation.field}')
+    return model._base_manager.filter(pk__in=pks)._raw_delete(
+        model._base_manager.db)
+
+
+def recount_comments(post_ids):
+    counts = (Comment.objects.filter(post=OuterRef('pk')).order_by()
+              .values('post').annotate(total=Count('pk')).values('total'))
+    Post.objects.filter(pk__in=post_ids).update(
+        comment_count=Coalesce(Subquery(counts), 0))
+
+
+def recount_follows(user_ids):
+    def count(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('user')}).order_by()
+            .values(field).annotate(total=Count('pk')).values('total')), 0)
+
+    FollowStats.objects.filter(user__in=user_ids).update(
+        followers_count=count('author'), following_count=count('user'))
+
+
+def remove_images(names):
+    try:
+        for name in names:
+            delete_image(name)
+    finally:
+        connections.close_all()
+
+
+def move_posts(queryset, group, **kwargs):
+    """Переносит посты в group (None - убирает из группы)."""
+    def move(batch):
+        ids = list(batch.values_list('pk', flat=True))
+        Post.objects.filter(pk__in=ids).update(group=group)
+        posts_bulk_changed.send(sender=Post, ids=ids)
+        return len(ids)
+
+    return in_batches(queryset, move, **kwargs)
+
+
+def delete_posts(queryset, **kwargs):
+    """Удаляет посты вместе с комментариями; картинки удаляются в фоне."""
+    def delete(batch):
+        rows = list(batch.values_list('pk', 'image'))
+        ids = [pk for pk, _ in rows]
+        images = [image for _, image in rows if image]
+        raw_delete(Post, ids)
+        posts_bulk_changed.send(sender=Post, ids=ids)
+        if images:
+            transaction.on_commit(
+                lambda: image_cleaner.submit(remove_images, images))
+        return len(ids)
+
+    return in_batches(queryset, delete, **kwargs)
+
+
+def delete_comments(queryset, **kwargs):
+    """Удаляет комментарии и пересчитывает счётчики их постов."""
+    def delete(batch):
+        rows = list(batch.values_list('pk', 'post_id'))
+        post_ids = {post_id for _, post_id in rows if post_id}
+        raw_delete(Comment, [pk for pk, _ in rows])
+        recount_comments(post_ids)
+        posts_bulk_changed.send(sender=Post, ids=list(post_ids))
+        return len(rows)
+
+    return in_batches(queryset, delete, **kwargs)
+
+
+def delete_authors(users, progress=None, **kwargs):
+    """Удаляет авторов: сначала порциями их посты и комментарии.
+
+    progress(stage, done) сообщает о ходе каждого этапа.
+    """
+    def report(stage):
+        return (lambda done: progress(stage, done)) if progress else None
+
+    user_ids = list(users.values_list('pk', flat=True))
+    posts = delete_posts(Post.objects.filter(author__in=user_ids),
+                         progress=report('posts'), **kwargs)
+    comments = delete_comments(Comment.objects.filter(author__in=user_ids),
+                               progress=report('comments'), **kwargs)
+
+    def delete(batch):
+        ids = list(batch.values_list('pk', flat=True))
+        related = set(
+            Follow.objects.filter(user__in=ids)
+            .values_list('author_id', flat=True))
+        related.update(
+            Follow.objects.filter(author__in=ids)
+            .values_list('user_id', flat=True))
+        deleted = batch.delete()[1].get(batch.model._meta.label, 0)
+        recount_follows(related - set(ids))
+        return deleted
+
+    authors = in_batches(users.model._default_manager.filter(
+        pk__in=user_ids), delete, progress=report('authors'), **kwargs)
+    return {'posts': posts, 'comments': comments, 'authors': authors}
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from .models import Group
+
+GROUP_CHOICES_VERSION_KEY = 'posts:group-choices-version'
+GROUP_CHOICES_KEY = 'posts:group-choices:{version}'
+
+
+def get_version():
+    version = cache.get(GROUP_CHOICES_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(GROUP_CHOICES_VERSION_KEY, version, None)
+    return version
+
+
+def get_group_choices():
+    """Пары (id, название) всех групп по названию.
+
+    Список хранится в кэше под текущей версией; изменение любой группы
+    увеличивает версию, и старый список больше не читается. Версия
+    общая только при общем кэше, поэтому список ещё и живёт не дольше
+    GROUP_CHOICES_TIMEOUT.
+    """
+    key = GROUP_CHOICES_KEY.format(version=get_version())
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(Group.objects.order_by('title')
+                       .values_list('pk', 'title'))
+        cache.set(key, choices, settings.GROUP_CHOICES_TIMEOUT)
+    return choices
+
+
+def invalidate_group_choices(sender, **kwargs):
+    try:
+        cache.incr(GROUP_CHOICES_VERSION_KEY)
+    except ValueError:
+        cache.delete(GROUP_CHOICES_KEY.format(version=1))
+
+
+def search_group_choices(query, limit):
+    query = query.casefold()
+    return [(pk, title) for pk, title in get_group_choices()
+            if query in title.casefold()][:limit]
+
+
+class CachedGroupQuerySet(models.QuerySet):
+    """Все группы из кэша для ModelChoiceField.
+
+    Перебор и count() без фильтров не обращаются к базе: для рендера
+    списка хватает групп с отложенными полями, кроме названия. Выбранная
+    группа (get) проверяется по базе, кэш может отставать.
+    """
+
+    def is_cached(self):
+        return not self.query.where and self.query.can_filter()
+
+    def cached_instance(self, pk, title):
+        return Group.from_db(self.db, ['id', 'title'], [pk, title])
+
+    def iterator(self, chunk_size=2000):
+        if not self.is_cached():
+            return super().iterator(chunk_size)
+        return (self.cached_instance(*choice)
+                for choice in get_group_choices())
+
+    def count(self):
+        if not self.is_cached():
+            return super().count()
+        return len(get_group_choices())
+
+
+def cached_groups():
+    return CachedGroupQuerySet(model=Group)
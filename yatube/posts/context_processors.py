@@ -0,0 +1,13 @@
+from .notifications import unread_count
+
+
+def notifications(request):
+    """Число непрочитанных уведомлений для значка в шапке.
+
+    Считается лениво из кэша, только если шаблон его выводит.
+    """
+    def unread():
+        user = request.user
+        return unread_count(user.pk) if user.is_authenticated else 0
+
+    return {'unread_notifications': unread}
@@ -1,13 +1,46 @@
 from django import forms
+from django.conf import settings
+from django.urls import reverse_lazy
 
+from .choices import cached_groups
 from .models import Post, Comment
 
 
+class GroupAutocompleteSelect(forms.Select):
+    """Select только с выбранной группой, остальные ищутся по мере ввода."""
+
+    class Media:
+        js = ('js/group_autocomplete.js',)
+
+    def __init__(self, attrs=None):
+        attrs = {'data-autocomplete-url': reverse_lazy('posts:group_search'),
+                 **(attrs or {})}
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(item) for item in value}
+        choices = self.choices
+        self.choices = [(key, label) for key, label in choices
+                        if key == '' or str(key) in selected]
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group = self.fields['group']
+        queryset = cached_groups()
+        if queryset.count() > settings.GROUP_SELECT_LIMIT:
+            group.widget = GroupAutocompleteSelect()
+        group.queryset = queryset
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
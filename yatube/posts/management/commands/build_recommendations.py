@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для подписки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Только изменившие подписки и их подписчики')
+        parser.add_argument('--top-k', type=int, default=None)
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['incremental']:
+            user_ids = recommendations.stale_user_ids()
+        else:
+            user_ids = recommendations.all_user_ids()
+        user_ids = list(user_ids)
+        if not user_ids:
+            self.stdout.write('Пересчитывать нечего')
+            return
+        total = recommendations.build(
+            user_ids, top_k=options['top_k'],
+            chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(user_ids)}, рекомендаций: {total}, '
+            f'{time.monotonic() - started:.2f} с'))
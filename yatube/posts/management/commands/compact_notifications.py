@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import compact
+
+
+class Command(BaseCommand):
+    help = 'Удаляет старые прочитанные уведомления и лишние сверх лимита'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=None)
+        parser.add_argument('--max-per-user', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        deleted = compact(keep_days=options['keep_days'],
+                          max_per_user=options['max_per_user'],
+                          batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено прочитанных: {deleted["expired"]}, '
+            f'сверх лимита: {deleted["trimmed"]}'))
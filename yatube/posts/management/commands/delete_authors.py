@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Удаляет авторов вместе с постами и комментариями порциями'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username__in=options['usernames'])
+        missing = set(options['usernames']) - set(
+            users.values_list('username', flat=True))
+        if missing:
+            raise CommandError(
+                f'Пользователи не найдены: {", ".join(sorted(missing))}')
+        deleted = bulk.delete_authors(
+            users, batch_size=options['batch_size'],
+            progress=lambda stage, done: self.stdout.write(
+                f'{stage}: {done}'))
+        self.stdout.write(self.style.SUCCESS(
+            'Удалено авторов: {authors}, постов: {posts}, '
+            'комментариев: {comments}'.format(**deleted)))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Удаляет посты автора или группы порциями'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not options['author'] and not options['group']:
+            raise CommandError('Укажите --author и/или --group')
+        posts = Post.objects.all()
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+        deleted = bulk.delete_posts(
+            posts, batch_size=options['batch_size'],
+            progress=lambda done: self.stdout.write(f'Удалено: {done}'))
+        self.stdout.write(self.style.SUCCESS(f'Готово, постов: {deleted}'))
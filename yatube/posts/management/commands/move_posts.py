@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import bulk
+from posts.models import Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Переносит посты группы в другую группу порциями'
+
+    def add_arguments(self, parser):
+        parser.add_argument('group', help='slug исходной группы')
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--to', help='slug новой группы')
+        target.add_argument('--ungroup', action='store_true',
+                            help='Убрать посты из группы')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def get_group(self, slug):
+        try:
+            return Group.objects.get(slug=slug)
+        except Group.DoesNotExist:
+            raise CommandError(f'Группа {slug} не найдена')
+
+    def handle(self, *args, **options):
+        source = self.get_group(options['group'])
+        target = None if options['ungroup'] else self.get_group(
+            options['to'])
+        moved = bulk.move_posts(
+            Post.objects.filter(group=source), target,
+            batch_size=options['batch_size'],
+            progress=lambda done: self.stdout.write(f'Перенесено: {done}'))
+        self.stdout.write(self.style.SUCCESS(f'Готово, постов: {moved}'))
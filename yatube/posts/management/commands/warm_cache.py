@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from posts import warmup
+
+
+class Command(BaseCommand):
+    help = ('Рендерит популярные страницы и миниатюры, чтобы первые '
+            'посетители после деплоя не ждали')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int,
+                            default=settings.WARM_CACHE_PAGES)
+        parser.add_argument('--groups', type=int,
+                            default=settings.WARM_CACHE_GROUPS)
+        parser.add_argument('--profiles', type=int,
+                            default=settings.WARM_CACHE_PROFILES)
+        parser.add_argument('--posts', type=int,
+                            default=settings.WARM_CACHE_POSTS)
+        parser.add_argument('--workers', type=int,
+                            default=settings.WARM_CACHE_WORKERS)
+        parser.add_argument(
+            '--base-url', default=None,
+            help='Запрашивать страницы у запущенного сервера, например '
+                 'http://127.0.0.1:8000')
+        parser.add_argument('--no-thumbnails', action='store_true')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        base_url = options['base_url']
+        if base_url is None and isinstance(caches['default'], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                'LocMemCache хранится в памяти процесса: страницы прогреются '
+                'только для этой команды. Укажите --base-url запущенного '
+                'сервера.'))
+        started = time.monotonic()
+        if not options['no_thumbnails']:
+            images = warmup.thumbnail_images(options['pages'],
+                                             options['posts'])
+            self.stage('Миниатюры', warmup.make_thumbnail, images,
+                       options['workers'])
+        urls = warmup.page_urls(options['pages'], options['groups'],
+                                options['profiles'], options['posts'])
+        fetch = (warmup.http_fetch(base_url) if base_url
+                 else warmup.client_fetch())
+        self.stage('Страницы', fetch, urls, options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.2f} с'))
+
+    def stage(self, title, func, items, workers):
+        done = errors = 0
+
+        def progress(item, result, seconds):
+            nonlocal done, errors
+            done += 1
+            failed = isinstance(result, Exception) or result not in (
+                'ok', 200)
+            errors += failed
+            if failed or self.verbosity > 1:
+                self.stdout.write(
+                    f'[{done}/{len(items)}] {item}: {result} '
+                    f'({seconds * 1000:.0f} мс)')
+
+        started = time.monotonic()
+        timings = warmup.run(func, items, workers, progress)
+        if not timings:
+            self.stdout.write(f'{title}: нечего прогревать')
+            return
+        timings.sort()
+        self.stdout.write(
+            f'{title}: {len(timings)}, ошибок: {errors}, '
+            f'{time.monotonic() - started:.2f} с, '
+            f'медиана {timings[len(timings) // 2] * 1000:.0f} мс, '
+            f'максимум {timings[-1] * 1000:.0f} мс')
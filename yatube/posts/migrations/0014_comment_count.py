@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:08
+
+from django.db import migrations, models
+
+
+def count_comments(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    counts = (Comment.objects.filter(post__isnull=False)
+              .values_list('post_id')
+              .annotate(models.Count('id')))
+    for post_id, count in counts.order_by():
+        Post.objects.filter(pk=post_id).update(comment_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_ordering_id'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['created', 'id']},
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created', 'id'], name='posts_comme_post_id_9660d8_idx'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    FollowStats = apps.get_model('posts', 'FollowStats')
+    # повторные подписки мешают уникальному ограничению
+    duplicates = (Follow.objects.values('user_id', 'author_id')
+                  .annotate(first=models.Min('id'), total=models.Count('id'))
+                  .filter(total__gt=1).order_by())
+    for row in duplicates:
+        Follow.objects.filter(
+            user_id=row['user_id'], author_id=row['author_id'],
+        ).exclude(id=row['first']).delete()
+    stats = {}
+    following = (Follow.objects.values_list('user_id')
+                 .annotate(models.Count('id')).order_by())
+    for user_id, count in following:
+        stats.setdefault(user_id, FollowStats(user_id=user_id))
+        stats[user_id].following_count = count
+    followers = (Follow.objects.values_list('author_id')
+                 .annotate(models.Count('id')).order_by())
+    for user_id, count in followers:
+        stats.setdefault(user_id, FollowStats(user_id=user_id))
+        stats[user_id].followers_count = count
+    FollowStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0014_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('followers_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_follows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:20
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Копия posts.utils.render_text и POST_EXCERPT_LENGTH на момент миграции:
+# будущие изменения кода приложения не должны менять её результат.
+EXCERPT_LENGTH = 500
+
+
+def render_text(text, length):
+    html = linebreaksbr(text, autoescape=True)
+    short = Truncator(text).chars(length)
+    if short == text:
+        return html, html, False
+    return html, linebreaksbr(short, autoescape=True), True
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    last = 0
+    while True:
+        posts = list(Post.objects.filter(pk__gt=last).order_by('pk')
+                     .only('pk', 'text')[:500])
+        if not posts:
+            return
+        for post in posts:
+            post.text_html, post.excerpt_html, post.is_truncated = (
+                render_text(post.text, EXCERPT_LENGTH))
+        Post.objects.bulk_update(
+            posts, ['text_html', 'excerpt_html', 'is_truncated'])
+        last = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_truncated',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,207 @@
+"""Ответ 404 без запроса к базе для несуществующих профилей, групп и постов.
+
+Каждый процесс держит фильтр Блума существующих значений: если значения
+в фильтре нет, объекта точно нет. Фильтр строится из базы в фоновом
+потоке после первой проверки и заново раз в MISSING_FILTER_MAX_AGE
+секунд. Сохранённые пользователи и группы добавляются в фильтр и
+увеличивают поколение в кэше, по которому остальные процессы понимают,
+что их фильтр устарел.
+Id постов только растут, поэтому id больше наибольшего на момент сборки
+фильтр не отсекает. Значения, для которых view уже ответил 404,
+запоминаются в кэше на MISSING_CACHE_TIMEOUT секунд.
+
+Поколение и кэш промахов должны быть общими для всех процессов: с кэшем
+в памяти процесса (LocMemCache) другой процесс вернёт 404 на новый
+профиль или группу до перестройки своего фильтра, поэтому там
+MISSING_CACHE_ENABLED выключена.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Max
+from django.http import Http404
+
+from core.bloom import BloomFilter
+from core.views import not_found
+from .models import Group, Post, User
+
+GENERATION_KEY = 'missing:generation:{kind}'
+MISSING_KEY = 'missing:{kind}:{digest}'
+
+rebuilder = ThreadPoolExecutor(max_workers=1)
+
+
+class Lookup:
+    """Фильтр Блума значений поля field модели model."""
+
+    def __init__(self, kind, model, field):
+        self.kind = kind
+        self.model = model
+        self.field = field
+        self.by_id = field == 'pk'
+        self.lock = threading.Lock()
+        self.rebuilding = threading.Lock()
+        self.bloom = None
+        self.generation = None
+        self.max_id = None
+        self.built = 0
+        self.scheduled = False
+
+    @property
+    def generation_key(self):
+        return GENERATION_KEY.format(kind=self.kind)
+
+    def missing_key(self, value):
+        # значение из адреса может быть длинным и с любыми символами
+        digest = hashlib.md5(str(value).encode()).hexdigest()
+        return MISSING_KEY.format(kind=self.kind, digest=digest)
+
+    def current_generation(self):
+        generation = cache.get(self.generation_key)
+        if generation is None:
+            generation = 1
+            cache.add(self.generation_key, generation, None)
+        return generation
+
+    def rebuild(self):
+        """Строит фильтр заново; пока строит другой поток, ничего не ждёт."""
+        if not self.rebuilding.acquire(blocking=False):
+            return
+        try:
+            generation = self.current_generation()
+            objects = self.model._default_manager.order_by()
+            max_id = (objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+                      if self.by_id else None)
+            values = objects.values_list(self.field, flat=True)
+            if self.by_id:
+                values = values.filter(pk__lte=max_id)
+            bloom = BloomFilter(
+                max(values.count() * 2, settings.MISSING_FILTER_CAPACITY),
+                settings.MISSING_FILTER_ERROR_RATE)
+            for value in values.iterator():
+                bloom.add(value)
+            with self.lock:
+                # пока фильтр строился, значения могли добавиться
+                if self.current_generation() == generation:
+                    self.bloom = bloom
+                    self.max_id = max_id
+                    self.generation = generation
+                else:
+                    self.bloom = None
+                self.built = time.monotonic()
+        finally:
+            self.rebuilding.release()
+
+    def schedule_rebuild(self):
+        """Перестраивает фильтр в фоне: чтение всей таблицы не должно
+        задерживать запрос."""
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+        rebuilder.submit(self.rebuild_in_background)
+
+    def rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            with self.lock:
+                self.scheduled = False
+            connections.close_all()
+
+    def is_missing(self, value):
+        """True, только если value точно нет в базе."""
+        missing_key = self.missing_key(value)
+        cached = cache.get_many([self.generation_key, missing_key])
+        if missing_key in cached:
+            return True
+        generation = (cached.get(self.generation_key)
+                      or self.current_generation())
+        if (generation != self.generation or time.monotonic() - self.built
+                > settings.MISSING_FILTER_MAX_AGE):
+            # до конца сборки отвечает база или фильтр того же поколения
+            self.schedule_rebuild()
+        with self.lock:
+            if self.bloom is None or generation != self.generation:
+                return False
+            if self.by_id and value > self.max_id:
+                return False
+            return value not in self.bloom
+
+    def remember_missing(self, value):
+        cache.set(self.missing_key(value), True,
+                  settings.MISSING_CACHE_TIMEOUT)
+
+    def add(self, value):
+        """Добавляет сохранённое значение; для постов поколение не меняется."""
+        cache.delete(self.missing_key(value))
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(value)
+            if self.by_id:
+                return
+            try:
+                generation = cache.incr(self.generation_key)
+            except ValueError:
+                cache.add(self.generation_key, 1, None)
+                generation = None
+            # свой фильтр значение уже содержит и остаётся актуальным
+            if generation and self.generation == generation - 1:
+                self.generation = generation
+
+
+lookups = {
+    'user': Lookup('user', User, 'username'),
+    'group': Lookup('group', Group, 'slug'),
+    'post': Lookup('post', Post, 'pk'),
+}
+
+
+def remember_saved(sender, instance, update_fields=None, **kwargs):
+    """Добавляет сохранённый объект в фильтр сразу и ещё раз после коммита.
+
+    Второй раз нужен фильтру, который строился в другом соединении, пока
+    транзакция не была видна.
+    """
+    if not settings.MISSING_CACHE_ENABLED:
+        return
+    for lookup in lookups.values():
+        if not isinstance(instance, lookup.model):
+            continue
+        field = 'pk' if lookup.by_id else lookup.field
+        if update_fields is not None and field not in update_fields:
+            continue
+        value = instance.pk if lookup.by_id else getattr(instance, field)
+        lookup.add(value)
+        transaction.on_commit(
+            lambda lookup=lookup, value=value: lookup.add(value))
+
+
+def skip_missing(kind, kwarg):
+    """Отвечает заготовленной 404 на значения kwarg, которых точно нет.
+
+    Если view сам ответил 404, значение запоминается как отсутствующее.
+    """
+    lookup = lookups[kind]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.MISSING_CACHE_ENABLED:
+                return view(request, *args, **kwargs)
+            value = kwargs[kwarg]
+            if lookup.is_missing(value):
+                return not_found(request)
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                lookup.remember_missing(value)
+                raise
+        return wrapper
+    return decorator
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .utils import render_text
 
 User = get_user_model()
 
@@ -41,9 +45,32 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    # готовый HTML текста и его начала для лент, см. save()
+    text_html = models.TextField(default='', editable=False)
+    excerpt_html = models.TextField(default='', editable=False)
+    is_truncated = models.BooleanField(default=False, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.text_html, self.excerpt_html, self.is_truncated = render_text(
+            self.text, settings.POST_EXCERPT_LENGTH)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'text_html', 'excerpt_html', 'is_truncated'}
+        super().save(*args, **kwargs)
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            # сортировка лент и date_hierarchy в админке
+            models.Index(fields=['pub_date', 'id'],
+                         name='post_pub_date_id_idx'),
+        ]
 
 
 class Comment(models.Model):
@@ -63,6 +90,12 @@ class Comment(models.Model):
 
     created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['created', 'id']
+        indexes = [
+            models.Index(fields=['post', 'created', 'id']),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -76,3 +109,121 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_follow'),
+        ]
+
+
+class FollowStats(models.Model):
+    """Счётчики подписчиков и подписок пользователя."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_stats',
+    )
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # подписки изменились после последнего расчёта рекомендаций
+    recommendations_stale = models.BooleanField(default=True)
+
+    @classmethod
+    def change(cls, user_id, field, delta, **extra):
+        """Сдвигает счётчик field на delta, не уходя ниже нуля."""
+        stats = cls.objects.filter(user_id=user_id)
+        if delta < 0:
+            stats = stats.filter(**{f'{field}__gte': -delta})
+        updated = stats.update(**{field: models.F(field) + delta}, **extra)
+        if not updated and delta > 0:
+            cls.objects.create(user_id=user_id, **{field: delta}, **extra)
+
+
+class Recommendation(models.Model):
+    """Предрасчитанный автор, на которого стоит подписаться."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['user', '-score', 'author']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_recommendation'),
+        ]
+
+
+class TrendingPost(models.Model):
+    """Рейтинг поста по недавней активности (см. posts.trending)."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+    )
+    score = models.FloatField(db_index=True)
+
+    class Meta:
+        ordering = ['-score']
+
+
+class TrendingGroup(models.Model):
+    """Рейтинг группы по недавней активности (см. posts.trending)."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+    )
+    score = models.FloatField(db_index=True)
+
+    class Meta:
+        ordering = ['-score']
+
+
+class Notification(models.Model):
+    """Уведомление автора о комментарии или новом подписчике."""
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KINDS = [
+        (COMMENT, 'Комментарий'),
+        (FOLLOW, 'Подписка'),
+    ]
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    kind = models.CharField(max_length=16, choices=KINDS)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='notifications',
+    )
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read'],
+                         name='notification_unread_idx'),
+        ]
@@ -0,0 +1,173 @@
+"""Уведомления о комментариях и подписках.
+
+События копятся в памяти процесса и записываются в базу пачкой
+bulk_create в фоновом потоке, поэтому запрос не ждёт записи. Число
+непрочитанных хранится в кэше и увеличивается при каждом сбросе, так
+что значок в шапке не обращается к базе. Кэш процесса не видит сбросов
+в других процессах, поэтому счётчик живёт не дольше
+NOTIFICATIONS_UNREAD_TIMEOUT и затем пересчитывается.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.db import atomic_write
+from .models import Notification, Post, User
+
+UNREAD_KEY = 'notifications:unread:{user_id}'
+
+flusher = ThreadPoolExecutor(max_workers=1)
+
+
+def unread_count(user_id):
+    key = UNREAD_KEY.format(user_id=user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient_id=user_id, is_read=False).count()
+        cache.add(key, count, settings.NOTIFICATIONS_UNREAD_TIMEOUT)
+    return count
+
+
+def add_unread(counts):
+    """Увеличивает закэшированные счётчики; отсутствующие пересчитаются."""
+    for user_id, count in counts.items():
+        try:
+            cache.incr(UNREAD_KEY.format(user_id=user_id), count)
+        except ValueError:
+            pass
+
+
+def mark_read(user_id, ids):
+    """Отмечает прочитанными уведомления ids и уменьшает счётчик."""
+    updated = Notification.objects.filter(
+        recipient_id=user_id, pk__in=ids, is_read=False).update(is_read=True)
+    key = UNREAD_KEY.format(user_id=user_id)
+    try:
+        if cache.decr(key, updated) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+    return updated
+
+
+def save_notifications(rows):
+    """Записывает уведомления, пропуская удалённые за время ожидания посты
+    и пользователей."""
+    post_ids = {row.post_id for row in rows if row.post_id}
+    user_ids = {row.actor_id for row in rows} | {
+        row.recipient_id for row in rows}
+    posts = set(Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', flat=True))
+    users = set(User.objects.filter(pk__in=user_ids).values_list(
+        'pk', flat=True))
+    rows = [row for row in rows
+            if row.actor_id in users and row.recipient_id in users
+            and (row.post_id is None or row.post_id in posts)]
+    Notification.objects.bulk_create(rows, batch_size=500)
+    return rows
+
+
+class Buffer:
+    """Копит уведомления в памяти и сбрасывает их пачками.
+
+    Сброс запускается в фоне, как только набралось
+    NOTIFICATIONS_BATCH_SIZE уведомлений, и не позже чем через
+    NOTIFICATIONS_FLUSH_INTERVAL секунд после первого несброшенного:
+    его ждёт таймер, поэтому на тихом сайте уведомление не застревает.
+    При остановке процесса теряется не больше этого интервала событий.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.timer = None
+
+    def add(self, **fields):
+        with self.lock:
+            self.pending.append(Notification(**fields))
+            due = len(self.pending) >= settings.NOTIFICATIONS_BATCH_SIZE
+            if not due and self.timer is None:
+                self.timer = threading.Timer(
+                    settings.NOTIFICATIONS_FLUSH_INTERVAL, flusher.submit,
+                    [self.flush_in_background])
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            flusher.submit(self.flush_in_background)
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return 0
+        rows = atomic_write(save_notifications, pending)
+        counts = {}
+        for row in rows:
+            counts[row.recipient_id] = counts.get(row.recipient_id, 0) + 1
+        add_unread(counts)
+        return len(rows)
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+buffer = Buffer()
+
+
+def notify(recipient_id, actor_id, kind, post_id=None):
+    """Ставит уведомление в буфер после коммита транзакции события."""
+    if recipient_id == actor_id:
+        return
+    created = timezone.now()
+    transaction.on_commit(lambda: buffer.add(
+        recipient_id=recipient_id, actor_id=actor_id, kind=kind,
+        post_id=post_id, created=created))
+
+
+def delete_in_batches(queryset, batch_size):
+    """Удаляет queryset порциями, каждую в своей короткой транзакции."""
+    def delete(ids):
+        return Notification.objects.filter(pk__in=ids).delete()[0]
+
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += atomic_write(delete, ids)
+
+
+def compact(keep_days=None, max_per_user=None, batch_size=None):
+    """Удаляет прочитанные уведомления старше keep_days дней и всё сверх
+    max_per_user последних у каждого пользователя."""
+    keep_days = keep_days or settings.NOTIFICATIONS_KEEP_DAYS
+    max_per_user = max_per_user or settings.NOTIFICATIONS_MAX_PER_USER
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    expired = delete_in_batches(Notification.objects.filter(
+        is_read=True, created__lt=timezone.now() - timedelta(days=keep_days)),
+        batch_size)
+    crowded = list(
+        Notification.objects.order_by().values('recipient')
+        .annotate(total=Count('pk')).filter(total__gt=max_per_user)
+        .values_list('recipient', flat=True))
+    trimmed = 0
+    for user_id in crowded:
+        ids = Notification.objects.filter(recipient_id=user_id).order_by(
+            '-pk').values_list('pk', flat=True)
+        trimmed += delete_in_batches(Notification.objects.filter(
+            recipient_id=user_id, pk__lte=ids[max_per_user]), batch_size)
+        cache.delete(UNREAD_KEY.format(user_id=user_id))
+    return {'expired': expired, 'trimmed': trimmed}
@@ -0,0 +1,116 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, FollowStats, Post, Recommendation, User
+
+# Вес пути «подписка подписки» и общей с автором группы
+FRIEND_OF_FRIEND_WEIGHT = 2.0
+SHARED_GROUP_WEIGHT = 1.0
+
+
+class Graph:
+    """Граф подписок и авторов групп в памяти в виде словарей множеств."""
+
+    def __init__(self):
+        self.following = defaultdict(set)
+        self.author_groups = defaultdict(set)
+        self.group_authors = defaultdict(set)
+
+    @classmethod
+    def load(cls):
+        graph = cls()
+        follows = Follow.objects.values_list('user_id', 'author_id')
+        for user_id, author_id in follows.order_by().iterator():
+            graph.following[user_id].add(author_id)
+        authors = (Post.objects.filter(group__isnull=False)
+                   .values_list('author_id', 'group_id')
+                   .order_by().distinct())
+        for author_id, group_id in authors.iterator():
+            graph.author_groups[author_id].add(group_id)
+            graph.group_authors[group_id].add(author_id)
+        return graph
+
+    def recommend(self, user_id, top_k):
+        """Лучшие top_k пар (автор, вес) для user_id."""
+        followed = self.following.get(user_id, set())
+        scores = Counter()
+        for author_id in followed:
+            for candidate in self.following.get(author_id, ()):
+                scores[candidate] += FRIEND_OF_FRIEND_WEIGHT
+        groups = set(self.author_groups.get(user_id, ()))
+        for author_id in followed:
+            groups |= self.author_groups.get(author_id, set())
+        for group_id in groups:
+            for candidate in self.group_authors[group_id]:
+                scores[candidate] += SHARED_GROUP_WEIGHT
+        for skipped in followed | {user_id}:
+            scores.pop(skipped, None)
+        return heapq.nlargest(top_k, scores.items(),
+                              key=lambda item: (item[1], -item[0]))
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def set_stale(user_ids, stale, chunk_size):
+    for chunk in chunks(user_ids, chunk_size):
+        FollowStats.objects.filter(user_id__in=chunk).update(
+            recommendations_stale=stale)
+
+
+def build(user_ids, graph=None, top_k=None, chunk_size=None):
+    """Пересчитывает рекомендации пользователей user_ids.
+
+    Отметки recommendations_stale снимаются до загрузки графа: подписки,
+    изменившиеся во время пересчёта, отметят пользователя снова, и он
+    попадёт в следующий. Если пересчёт упал, отметки возвращаются.
+    Каждая порция из chunk_size пользователей заменяется в своей
+    транзакции. Возвращает число сохранённых рекомендаций.
+    """
+    user_ids = list(user_ids)
+    top_k = top_k or settings.RECOMMENDATIONS_TOP_K
+    chunk_size = chunk_size or settings.RECOMMENDATIONS_CHUNK_SIZE
+    set_stale(user_ids, False, chunk_size)
+    total = 0
+    try:
+        graph = graph or Graph.load()
+        for chunk in chunks(user_ids, chunk_size):
+            rows = [
+                Recommendation(user_id=user_id, author_id=author_id,
+                               score=score)
+                for user_id in chunk
+                for author_id, score in graph.recommend(user_id, top_k)
+            ]
+            with transaction.atomic():
+                Recommendation.objects.filter(user_id__in=chunk).delete()
+                Recommendation.objects.bulk_create(rows,
+                                                   batch_size=chunk_size)
+            total += len(rows)
+    except BaseException:
+        set_stale(user_ids, True, chunk_size)
+        raise
+    return total
+
+
+def all_user_ids():
+    return User.objects.order_by('id').values_list('id', flat=True)
+
+
+def stale_user_ids():
+    """Изменившие подписки и их подписчики.
+
+    У подписчиков изменились подписки подписок, поэтому их рекомендации
+    тоже устарели.
+    """
+    changed = list(FollowStats.objects.filter(recommendations_stale=True)
+                   .values_list('user_id', flat=True))
+    user_ids = set(changed)
+    for chunk in chunks(changed, settings.RECOMMENDATIONS_CHUNK_SIZE):
+        user_ids.update(Follow.objects.filter(author_id__in=chunk)
+                        .values_list('user_id', flat=True))
+    return sorted(user_ids)
@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+from core.pubsub import broker
+from .models import Notification, Post
+from .notifications import notify
+from .trending import add_post_event
+
+# Посты ids изменены или удалены массово, в обход сигналов моделей
+posts_bulk_changed = Signal(providing_args=['ids'])
+
+
+def drop_post_card(post_id):
+    """Сбрасывает закэшированную карточку поста (includes/post_card.html)."""
+    cache.delete(make_template_fragment_key('post_card', [post_id]))
+
+
+def invalidate_post_card(sender, instance, **kwargs):
+    drop_post_card(instance.pk)
+
+
+def invalidate_post_cards(sender, ids, **kwargs):
+    cache.delete_many([make_template_fragment_key('post_card', [pk])
+                       for pk in ids])
+
+
+def count_new_comment(sender, instance, created, **kwargs):
+    """Увеличивает Post.comment_count в той же транзакции."""
+    if created and instance.post_id:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+        drop_post_card(instance.post_id)
+
+
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.post_id:
+        Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1)
+        drop_post_card(instance.post_id)
+
+
+def post_channels(post):
+    channels = ['posts', f'author:{post.author_id}']
+    if post.group_id:
+        channels.append(f'group:{post.group_id}')
+    return channels
+
+
+def publish_post(sender, instance, created, **kwargs):
+    """Сообщает подписчикам лент о новом посте после коммита."""
+    if created:
+        transaction.on_commit(lambda: broker.publish(
+            post_channels(instance), ('post', instance.pk)))
+
+
+def publish_comment(sender, instance, created, **kwargs):
+    """Сообщает читателям поста о новом комментарии после коммита."""
+    if created and instance.post_id:
+        transaction.on_commit(lambda: broker.publish(
+            [f'comments:{instance.post_id}'], ('comment', instance.pk)))
+
+
+def trend_post(sender, instance, created, **kwargs):
+    if created:
+        add_post_event(instance.pk, instance.group_id, 'post')
+
+
+def trend_comment(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        add_post_event(instance.post_id, instance.post.group_id, 'comment')
+
+
+def trend_follow(sender, instance, created, **kwargs):
+    """Новая подписка поднимает последний пост автора."""
+    if not created:
+        return
+    latest = (Post.objects.filter(author_id=instance.author_id)
+              .values_list('pk', 'group_id').first())
+    if latest:
+        add_post_event(*latest, 'follow')
+
+
+def notify_comment(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        notify(instance.post.author_id, instance.author_id,
+               Notification.COMMENT, instance.post_id)
+
+
+def notify_follow(sender, instance, created, **kwargs):
+    if created:
+        notify(instance.author_id, instance.user_id, Notification.FOLLOW)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}',
+                                 description='description')
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.admin, text=f'Пост {i}',
+                 group=self.groups[i % len(self.groups)])
+            for i in range(count)
+        )
+
+    def count_queries(self, *args):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, *args)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries]
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Число запросов списка не зависит от числа строк."""
+        self.create_posts(3)
+        self.count_queries()
+        few = self.count_queries()
+        self.create_posts(40)
+        many = self.count_queries()
+        self.assertEqual(len(few), len(many))
+        self.assertFalse([sql for sql in many if 'posts_group' in sql
+                          and 'JOIN' not in sql])
+
+    def test_no_full_count(self):
+        """Список, поиск и даты обходятся без полного COUNT(*) по постам."""
+        self.create_posts(3)
+        now = timezone.now()
+        week = {'pub_date__gte': (now - timedelta(days=7)).date(),
+                'pub_date__lt': (now + timedelta(days=1)).date()}
+        for params in ({}, {'q': 'Пост'}, week, {**week, 'q': 'Пост'},
+                       {'pub_date__year': now.year,
+                        'pub_date__month': now.month}):
+            with self.subTest(params=params):
+                queries = self.count_queries(params)
+                full_counts = [sql for sql in queries
+                               if sql.startswith('SELECT COUNT(*)')
+                               and 'LIMIT' not in sql]
+                self.assertEqual(full_counts, [])
+
+    def test_group_choices_invalidated(self):
+        """Новая группа сразу появляется в выпадающем списке."""
+        self.create_posts(1)
+        self.client.get(self.url)
+        Group.objects.create(title='Свежая группа', slug='fresh',
+                             description='description')
+        self.assertContains(self.client.get(self.url), 'Свежая группа')
+
+    @override_settings(ADMIN_SEARCH_WINDOW=5)
+    def test_search_only_recent(self):
+        """Текст ищется только среди последних ADMIN_SEARCH_WINDOW id."""
+        self.create_posts(10)
+        for term, found in (('Пост 9', True), ('Пост 0', False)):
+            with self.subTest(term=term):
+                queries = self.count_queries({'q': term})
+                response = self.client.get(self.url, {'q': term})
+                self.assertEqual(
+                    [post.text for post in response.context['cl'].result_list],
+                    [term] if found else [])
+                searches = [sql for sql in queries if 'LIKE' in sql]
+                self.assertTrue(searches)
+                for sql in searches:
+                    self.assertIn('"posts_post"."id" >', sql)
+
+    def test_deleted_rows_no_empty_pages(self):
+        """Удалённые посты не оставляют пустых страниц в конце списка."""
+        self.create_posts(250)
+        oldest = Post.objects.order_by('pk').values_list('pk', flat=True)
+        Post.objects.filter(pk__in=list(oldest[:200])).delete()
+        # p в админке считается с нуля; оценка по id - три страницы
+        for page in ('0', '2'):
+            with self.subTest(page=page):
+                response = self.client.get(self.url, {'p': page})
+                cl = response.context['cl']
+                self.assertEqual(len(cl.result_list), 50)
+                self.assertEqual(cl.result_count, 50)
+                self.assertEqual(cl.paginator.num_pages, 1)
+                self.assertFalse(cl.multi_page)
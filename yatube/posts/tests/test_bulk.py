@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import bulk
+from ..models import Comment, Follow, FollowStats, Group, Post, TrendingPost
+
+User = get_user_model()
+
+
+class BulkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.source = Group.objects.create(title='Откуда', slug='source',
+                                          description='description')
+        cls.target = Group.objects.create(title='Куда', slug='target',
+                                          description='description')
+
+    def setUp(self):
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}',
+                                group=self.source)
+            for i in range(5)
+        ]
+
+    def test_move_in_batches(self):
+        """Посты переносятся порциями с отчётом о ходе."""
+        progress = []
+        moved = bulk.move_posts(Post.objects.filter(group=self.source),
+                                self.target, batch_size=2,
+                                progress=progress.append)
+        self.assertEqual(moved, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(self.target.posts.count(), 5)
+
+    def test_delete_posts_cascades(self):
+        """Вместе с постами удаляются их комментарии и рейтинги."""
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.author, text='Текст')
+        TrendingPost.objects.create(post=post, score=1)
+        deleted = bulk.delete_posts(Post.objects.filter(pk=post.pk))
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(TrendingPost.objects.exists())
+        self.assertEqual(Post.objects.count(), 4)
+
+    def test_delete_authors_recounts(self):
+        """После удаления спамера счётчики остальных пересчитаны."""
+        Post.objects.create(author=self.spammer, text='Спам')
+        for post in self.posts[:2]:
+            Comment.objects.create(post=post, author=self.spammer,
+                                   text='Спам')
+        Comment.objects.create(post=self.posts[0], author=self.author,
+                               text='Ответ')
+        client = Client()
+        client.force_login(self.spammer)
+        client.get(reverse('posts:profile_follow',
+                           args=(self.author.username,)))
+        self.assertEqual(FollowStats.objects.get(
+            user=self.author).followers_count, 1)
+        out = StringIO()
+        call_command('delete_authors', 'spammer', '--batch-size', '1',
+                     stdout=out)
+        self.assertIn('постов: 1, комментариев: 2', out.getvalue())
+        self.assertFalse(User.objects.filter(username='spammer').exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(FollowStats.objects.get(
+            user=self.author).followers_count, 0)
+        counts = dict(Post.objects.values_list('pk', 'comment_count'))
+        self.assertEqual(counts[self.posts[0].pk], 1)
+        self.assertEqual(counts[self.posts[1].pk], 0)
+
+    def test_admin_move_action(self):
+        """Действие админки переносит выбранные посты в группу из формы."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.post(
+            reverse('admin:posts_post_changelist'), {
+                'action': 'move_to_group',
+                'group': self.target.pk,
+                '_selected_action': [post.pk for post in self.posts[:3]],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.target.posts.count(), 3)
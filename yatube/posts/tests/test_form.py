@@ -1,7 +1,14 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from ..choices import get_group_choices
+from ..forms import GroupAutocompleteSelect, PostForm
 from ..models import Post, Group, User
 
 
@@ -99,6 +106,20 @@ class PostFormTests(TestCase):
         self.assertRedirects(response, reverse('posts:post_detail', args=(1,)))
         self.assertNotEqual(modified_post.text, self.post_0.text)
 
+    def test_edit_keeps_comment_count(self):
+        """Правка поста не затирает счётчик, изменённый во время запроса."""
+        def write(func, *args, **kwargs):
+            Post.objects.filter(pk=self.post_0.pk).update(comment_count=5)
+            return func(*args, **kwargs)
+
+        with mock.patch('posts.views.run_write', side_effect=write):
+            self.authorized_client.post(
+                reverse('posts:post_edit', args=[self.post_0.id]),
+                data={'text': 'Правка', 'group': self.group.id})
+        post = Post.objects.get(pk=self.post_0.pk)
+        self.assertEqual(post.text, 'Правка')
+        self.assertEqual(post.comment_count, 5)
+
     def test_edit_post_invalid(self):
         """Проверка на невалидные данные."""
         form_data = {
@@ -139,3 +160,87 @@ class PostFormTests(TestCase):
         self.assertRedirects(
             response, "/auth/login/?next=/create/"
         )
+
+
+class PostFormGroupChoicesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}',
+                                 description='description')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def group_queries(self, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.generic(*args, **kwargs)
+        return response, [query['sql'] for query in queries
+                          if 'FROM "posts_group"' in query['sql']]
+
+    def test_choices_cached(self):
+        """Повторный рендер формы не обращается к таблице групп."""
+        url = reverse('posts:post_create')
+        self.authorized_client.get(url)
+        _, queries = self.group_queries('GET', url)
+        self.assertEqual(queries, [])
+
+    def test_group_checked_in_db(self):
+        """Выбранная группа проверяется по базе, а не по кэшу."""
+        PostForm()
+        form = PostForm(data={'text': 'Пост', 'group': self.groups[1].id})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['group'], self.groups[1])
+        # удалена в другом процессе: свой кэш об этом не знает
+        Group.objects.filter(pk=self.groups[2].pk)._raw_delete(
+            connection.alias)
+        self.assertIn((self.groups[2].pk, 'Группа 2'), get_group_choices())
+        form = PostForm(data={'text': 'Пост', 'group': self.groups[2].id})
+        self.assertFalse(form.is_valid())
+
+    def test_choices_invalidated(self):
+        """Новая группа сразу доступна в форме."""
+        PostForm()
+        group = Group.objects.create(title='Новая', slug='new',
+                                     description='description')
+        choices = list(PostForm().fields['group'].choices)
+        self.assertIn((group.pk, 'Новая'), choices)
+
+    @override_settings(GROUP_SELECT_LIMIT=2)
+    def test_autocomplete_above_limit(self):
+        """Много групп - только выбранная в списке и поиск по вводу."""
+        form = PostForm(instance=Post(author=self.user, group=self.groups[0]))
+        self.assertIsInstance(form.fields['group'].widget,
+                              GroupAutocompleteSelect)
+        html = str(form['group'])
+        self.assertIn('Группа 0', html)
+        self.assertNotIn('Группа 1', html)
+        response = self.authorized_client.get(
+            reverse('posts:group_search'), {'q': 'ппа 2'})
+        self.assertEqual(response.json()['results'],
+                         [{'id': self.groups[2].id, 'title': 'Группа 2'}])
+
+    @override_settings(GROUP_SELECT_LIMIT=2)
+    def test_autocomplete_script_after_select(self):
+        """Скрипт поиска подключается после select, который он ищет."""
+        content = self.authorized_client.get(
+            reverse('posts:post_create')).content.decode()
+        select = content.index('data-autocomplete-url')
+        script = content.index('js/group_autocomplete.js')
+        self.assertLess(select, script)
+
+    @override_settings(GROUP_SELECT_LIMIT=2)
+    def test_autocomplete_script_once_with_errors(self):
+        """С ошибками формы скрипт подключается один раз, после select."""
+        content = self.authorized_client.post(
+            reverse('posts:post_create'), {'text': ''}).content.decode()
+        self.assertIn('alert-danger', content)
+        self.assertEqual(content.count('js/group_autocomplete.js'), 1)
+        self.assertLess(content.index('data-autocomplete-url'),
+                        content.index('js/group_autocomplete.js'))
@@ -0,0 +1,104 @@
+import warnings
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import missing
+from ..missing import lookups
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(MISSING_CACHE_ENABLED=True)
+class MissingLookupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='description')
+        cls.post = Post.objects.create(author=cls.user, text='Пост',
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        for lookup in lookups.values():
+            lookup.rebuild()
+
+    def test_missing_without_queries(self):
+        """Несуществующие профиль, группа и пост - 404 без запросов к базе."""
+        urls = [
+            reverse('posts:profile', args=['nobody']),
+            reverse('posts:group_list', args=['nothing']),
+            reverse('posts:post_detail', args=[self.post.pk - 1]),
+        ]
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertContains(response, url, status_code=404)
+
+    def test_existing_pages(self):
+        """Существующие и созданные после сборки фильтра объекты доступны."""
+        newcomer = User.objects.create_user(username='newcomer')
+        group = Group.objects.create(title='Новая', slug='new',
+                                     description='description')
+        post = Post.objects.create(author=newcomer, text='Новый', group=group)
+        urls = [
+            reverse('posts:profile', args=['author']),
+            reverse('posts:profile', args=['newcomer']),
+            reverse('posts:group_list', args=['new']),
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:post_detail', args=[post.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    def test_remembers_misses(self):
+        """Промах, пропущенный фильтром, запоминается до создания объекта."""
+        url = reverse('posts:post_detail', args=[self.post.pk + 100])
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.guest_client.get(url).status_code, 404)
+        Post.objects.create(pk=self.post.pk + 100, author=self.user,
+                            text='Пост')
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    def test_other_process_generation(self):
+        """Новое поколение из кэша: до перестройки в фоне отвечает база."""
+        lookup = lookups['user']
+        cache.incr(lookup.generation_key)
+        url = reverse('posts:profile', args=['nobody'])
+        with mock.patch.object(missing.rebuilder, 'submit') as submit:
+            response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 404)
+        submit.assert_called_once_with(lookup.rebuild_in_background)
+        self.assertNotEqual(lookup.generation,
+                            cache.get(lookup.generation_key))
+        lookup.rebuild_in_background()
+        self.assertFalse(lookup.scheduled)
+        self.assertEqual(lookup.generation, cache.get(lookup.generation_key))
+
+    def test_key_from_any_input(self):
+        """Значение из адреса хэшируется и годится в ключ любого кэша."""
+        username = 'ник с пробелами\t' + 'x' * 300
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.guest_client.get(
+                reverse('posts:profile', args=[username]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_authorized_rendered(self):
+        """Авторизованным 404 рендерится с их шапкой."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:profile', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
+        self.assertTemplateUsed(response, 'core/404.html')
+        self.assertContains(response, 'author', status_code=404)
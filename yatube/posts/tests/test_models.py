@@ -1,5 +1,5 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from ..models import Group, Post
 
@@ -50,3 +50,19 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     self.post._meta.get_field(field).verbose_name, expected)
+
+    @override_settings(POST_EXCERPT_LENGTH=10)
+    def test_post_html_rendered_on_save(self):
+        """save() сохраняет экранированный HTML текста и его начало."""
+        post = Post.objects.create(author=self.user,
+                                   text='<b>Первая</b>\nвторая строка')
+        self.assertEqual(post.text_html,
+                         '&lt;b&gt;Первая&lt;/b&gt;<br>вторая строка')
+        self.assertTrue(post.is_truncated)
+        self.assertEqual(post.excerpt_html, '&lt;b&gt;Первая…')
+        post.text = 'Коротко'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual((post.text_html, post.excerpt_html),
+                         ('Коротко', 'Коротко'))
+        self.assertFalse(post.is_truncated)
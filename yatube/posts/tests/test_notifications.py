@@ -0,0 +1,154 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (Client, RequestFactory, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import notifications
+from ..context_processors import notifications as notifications_context
+from ..models import Notification, Post
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATIONS_FLUSH_INTERVAL=3600,
+                   NOTIFICATIONS_BATCH_SIZE=1000)
+class NotificationPipelineTest(TransactionTestCase):
+    def setUp(self):
+        notifications.buffer.flush()
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(author=self.author, text='Пост')
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_comment_and_follow(self):
+        """Комментарий и подписка попадают в базу пачкой при сбросе."""
+        self.assertEqual(notifications.unread_count(self.author.pk), 0)
+        self.client.post(reverse('posts:add_comment', args=[self.post.pk]),
+                         {'text': 'Комментарий'})
+        self.client.get(reverse('posts:profile_follow',
+                                args=[self.author.username]))
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(notifications.buffer.flush(), 2)
+        self.assertEqual(
+            set(Notification.objects.values_list(
+                'recipient', 'actor', 'kind', 'post')),
+            {(self.author.pk, self.reader.pk, 'comment', self.post.pk),
+             (self.author.pk, self.reader.pk, 'follow', None)})
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.author.pk), 2)
+
+    def test_own_comment_skipped(self):
+        """Автор не получает уведомлений о своих комментариях."""
+        self.client.force_login(self.author)
+        self.client.post(reverse('posts:add_comment', args=[self.post.pk]),
+                         {'text': 'Комментарий'})
+        self.assertEqual(notifications.buffer.flush(), 0)
+
+    def test_deleted_post_skipped(self):
+        """Уведомление об удалённом до сброса посте не записывается."""
+        self.client.post(reverse('posts:add_comment', args=[self.post.pk]),
+                         {'text': 'Комментарий'})
+        self.post.delete()
+        self.assertEqual(notifications.buffer.flush(), 0)
+
+    @override_settings(NOTIFICATIONS_BATCH_SIZE=2)
+    def test_flush_by_size(self):
+        """Набравшаяся пачка сбрасывается в фоне."""
+        with mock.patch.object(notifications.flusher, 'submit') as submit:
+            notifications.buffer.add(recipient_id=self.author.pk,
+                                     actor_id=self.reader.pk, kind='follow')
+            submit.assert_not_called()
+            notifications.buffer.add(recipient_id=self.author.pk,
+                                     actor_id=self.reader.pk, kind='follow')
+        submit.assert_called_once_with(
+            notifications.buffer.flush_in_background)
+        self.assertEqual(notifications.buffer.flush(), 2)
+
+    @override_settings(NOTIFICATIONS_FLUSH_INTERVAL=0.01)
+    def test_flush_by_timer(self):
+        """Одиночное уведомление сбрасывается таймером без новых событий."""
+        submitted = threading.Event()
+        with mock.patch.object(notifications.flusher, 'submit',
+                               side_effect=lambda func: submitted.set()):
+            notifications.buffer.add(recipient_id=self.author.pk,
+                                     actor_id=self.reader.pk, kind='follow')
+            self.assertTrue(submitted.wait(5))
+        self.assertEqual(notifications.buffer.flush(), 1)
+
+
+class NotificationViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def notify(self, count, **fields):
+        Notification.objects.bulk_create([
+            Notification(recipient=self.author, actor=self.reader,
+                         kind='comment', post=self.post, **fields)
+            for _ in range(count)])
+
+    def test_badge_from_cache(self):
+        """Значок в шапке берёт число из кэша без запросов к базе."""
+        self.notify(3)
+        request = RequestFactory().get('/')
+        request.user = self.author
+        unread = notifications_context(request)['unread_notifications']
+        self.assertEqual(unread(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread(), 3)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<span class="badge bg-danger">3</span>',
+                            html=True)
+
+    def test_list_marks_read(self):
+        """Страница уведомлений отмечает их прочитанными."""
+        self.notify(2)
+        self.assertEqual(notifications.unread_count(self.author.pk), 2)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['notifications']), 2)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.author.pk), 0)
+
+    @override_settings(NOTIFICATIONS_PER_PAGE=2)
+    def test_list_marks_only_shown(self):
+        """Непоказанные уведомления остаются непрочитанными."""
+        self.notify(3)
+        self.assertEqual(notifications.unread_count(self.author.pk), 3)
+        response = self.client.get(reverse('posts:notifications'))
+        shown = [item.pk for item in response.context['notifications']]
+        self.assertEqual(
+            list(Notification.objects.filter(is_read=False)
+                 .values_list('pk', flat=True)),
+            [pk for pk in Notification.objects.values_list('pk', flat=True)
+             if pk not in shown])
+        self.assertEqual(notifications.unread_count(self.author.pk), 1)
+
+    @override_settings(NOTIFICATIONS_KEEP_DAYS=30,
+                       NOTIFICATIONS_MAX_PER_USER=3)
+    def test_compact(self):
+        """Удаляются старые прочитанные и всё сверх лимита на пользователя."""
+        old = timezone.now() - timedelta(days=31)
+        self.notify(1, created=old, is_read=True)
+        self.notify(1, created=old)
+        self.notify(4)
+        newest = list(Notification.objects.values_list('pk', flat=True)[:3])
+        self.assertEqual(notifications.compact(),
+                         {'expired': 1, 'trimmed': 2})
+        self.assertEqual(
+            list(Notification.objects.values_list('pk', flat=True)), newest)
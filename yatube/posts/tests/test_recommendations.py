@@ -0,0 +1,103 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import recommendations
+from ..models import Follow, FollowStats, Group, Post, Recommendation
+from ..views import follow
+
+User = get_user_model()
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader, cls.friend, cls.fof, cls.neighbour = [
+            User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'fof', 'neighbour')
+        ]
+        group = Group.objects.create(title='Группа', slug='group',
+                                     description='description')
+        Post.objects.create(author=cls.reader, text='Пост', group=group)
+        Post.objects.create(author=cls.neighbour, text='Пост', group=group)
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.fof)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def build(self, *args):
+        call_command('build_recommendations', *args, stdout=StringIO())
+
+    def recommended(self, user):
+        return list(Recommendation.objects.filter(user=user)
+                    .values_list('author__username', flat=True))
+
+    def test_friends_of_friends_and_groups(self):
+        """Подписки подписок весят больше общих групп, свои не предлагаются."""
+        self.build()
+        self.assertEqual(self.recommended(self.reader), ['fof', 'neighbour'])
+
+    def test_incremental_only_stale(self):
+        """--incremental пересчитывает только изменивших подписки."""
+        self.build()
+        Recommendation.objects.all().delete()
+        self.client.get(reverse('posts:profile_follow',
+                                args=(self.neighbour.username,)))
+        self.assertTrue(FollowStats.objects.get(
+            user=self.reader).recommendations_stale)
+        self.build('--incremental')
+        self.assertEqual(self.recommended(self.reader), ['fof'])
+        self.assertEqual(self.recommended(self.friend), [])
+
+    def test_incremental_followers(self):
+        """Подписчики изменившего подписки тоже пересчитываются."""
+        star = User.objects.create_user(username='star')
+        self.build()
+        self.client.force_login(self.friend)
+        self.client.get(reverse('posts:profile_follow',
+                                args=(star.username,)))
+        self.build('--incremental')
+        self.assertIn('star', self.recommended(self.reader))
+
+    def test_follow_during_build_stays_stale(self):
+        """Подписка во время пересчёта попадает в следующий."""
+        load = recommendations.Graph.load
+
+        def load_with_follow():
+            follow(self.reader, self.neighbour)
+            return load()
+
+        with mock.patch.object(recommendations.Graph, 'load',
+                               side_effect=load_with_follow):
+            self.build()
+        self.assertTrue(FollowStats.objects.get(
+            user=self.reader).recommendations_stale)
+
+    def test_failed_build_keeps_stale(self):
+        """Упавший пересчёт возвращает отметки устаревших рекомендаций."""
+        follow(self.reader, self.neighbour)
+        with mock.patch.object(recommendations.Graph, 'load',
+                               side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.build('--incremental')
+        self.assertTrue(FollowStats.objects.get(
+            user=self.reader).recommendations_stale)
+
+    def test_follow_index_hides_followed(self):
+        """Лента подписок показывает рекомендации без уже подписанных."""
+        self.build()
+        url = reverse('posts:follow_index')
+        response = self.client.get(url)
+        authors = [item.author for item in response.context['recommendations']]
+        self.assertEqual(authors, [self.fof, self.neighbour])
+        Follow.objects.create(user=self.reader, author=self.fof)
+        response = self.client.get(url)
+        authors = [item.author for item in response.context['recommendations']]
+        self.assertEqual(authors, [self.neighbour])
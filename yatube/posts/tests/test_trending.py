@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, TrendingGroup, TrendingPost
+from ..trending import EPOCH, aggregator, log_add, log_score
+
+User = get_user_model()
+
+
+class LogScoreTest(TestCase):
+    @override_settings(TRENDING_HALF_LIFE=10)
+    def test_decay(self):
+        """Событие через период полураспада весит вдвое больше."""
+        self.assertAlmostEqual(log_add(log_score(1, EPOCH),
+                                       log_score(1, EPOCH)),
+                               log_score(2, EPOCH))
+        self.assertAlmostEqual(log_score(1, EPOCH + 10),
+                               log_score(2, EPOCH))
+
+
+@override_settings(TRENDING_FLUSH_INTERVAL=3600)
+class TrendingViewsTest(TransactionTestCase):
+    # события попадают в агрегатор только после коммита
+    def setUp(self):
+        aggregator.flush()
+        self.user = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.quiet = Group.objects.create(title='Тихая', slug='quiet',
+                                          description='description')
+        self.hot = Group.objects.create(title='Горячая', slug='hot',
+                                        description='description')
+        self.client = Client()
+
+    def tearDown(self):
+        aggregator.flush()
+
+    def test_rolled_back_event_ignored(self):
+        """Событие из откаченной транзакции не учитывается."""
+        try:
+            with transaction.atomic():
+                Post.objects.create(author=self.user, text='Откачен')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(aggregator.pending[TrendingPost], {})
+
+    def test_comments_raise_post(self):
+        """Пост с комментариями выше более новых постов без них."""
+        commented = Post.objects.create(author=self.user, text='Обсуждаемый',
+                                        group=self.hot)
+        newer = Post.objects.create(author=self.user, text='Новый',
+                                    group=self.quiet)
+        for i in range(2):
+            Comment.objects.create(post=commented, author=self.reader,
+                                   text=f'Комментарий {i}')
+        self.assertFalse(TrendingPost.objects.exists())
+        aggregator.flush()
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']),
+                         [commented, newer])
+        groups = [item.group for item in response.context['hot_groups']]
+        self.assertEqual(groups, [self.hot, self.quiet])
+
+    def test_flush_accumulates(self):
+        """Повторный сброс добавляет к рейтингу, а не заменяет его."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        aggregator.flush()
+        first = TrendingPost.objects.get(post=post).score
+        Follow.objects.create(user=self.reader, author=self.user)
+        aggregator.flush()
+        self.assertGreater(TrendingPost.objects.get(post=post).score, first)
+
+    def test_hot_groups_from_table(self):
+        """Список групп читается из рейтинга одним запросом."""
+        TrendingGroup.objects.create(group=self.quiet, score=1)
+        TrendingGroup.objects.create(group=self.hot, score=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:hot_groups'))
+        groups = [item.group for item in response.context['hot_groups']]
+        self.assertEqual(groups, [self.hot, self.quiet])
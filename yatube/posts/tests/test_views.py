@@ -1,11 +1,18 @@
+import zlib
+from unittest import mock
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, Client
+from django.db import connection
+from django.db.models import Model
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Group, Post, Comment, Follow
+from ..models import (Group, Post, Comment, Follow, FollowStats,
+                      Recommendation, TrendingPost)
 from ..views import AMOUNT_OF_POSTS
 
 User = get_user_model()
@@ -238,3 +245,264 @@ class PaginatorViewsTest(TestCase):
             reverse('posts:profile', kwargs={'username': self.user.username})
             + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 1)
+
+
+class FeedFragmentTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        for i in range(25):
+            Post.objects.create(author=cls.user, text=f'Тестовый пост {i}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_fragment_contains_only_cards(self):
+        """В режиме фрагмента отдаются только карточки постов."""
+        response = self.guest_client.get(
+            reverse('posts:index'), HTTP_X_FRAGMENT='1')
+        self.assertTemplateUsed(response, 'includes/post_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(len(response.context['posts']), AMOUNT_OF_POSTS)
+
+    def test_cursor_continues_page(self):
+        """Курсор со страницы ведёт по всем постам ленты."""
+        url = reverse('posts:profile', args=(self.user.username,))
+        cursor = self.guest_client.get(url).context['next_cursor']
+        seen = []
+        while cursor:
+            response = self.guest_client.get(
+                url, {'fragment': 1, 'cursor': cursor})
+            seen.extend(response.context['posts'])
+            cursor = response['X-Next-Cursor']
+        self.assertEqual(seen, list(Post.objects.all()[AMOUNT_OF_POSTS:]))
+
+    def test_bad_cursor(self):
+        """Некорректный курсор - ошибка 400."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'fragment': 1, 'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+class CommentsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_add_comment_updates_count(self):
+        """add_comment увеличивает счётчик комментариев поста."""
+        for i in range(3):
+            self.authorized_client.post(
+                reverse('posts:add_comment', args=(self.post.id,)),
+                data={'text': f'Комментарий {i}'})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+        Comment.objects.filter(post=self.post).first().delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+
+    def test_comments_paginated_in_order(self):
+        """Комментарии идут по времени страницами по COMMENTS_PER_PAGE."""
+        comments = [
+            Comment.objects.create(post=self.post, author=self.user,
+                                   text=f'Комментарий {i}')
+            for i in range(3)
+        ]
+        url = reverse('posts:post_detail', args=(self.post.id,))
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['all_comments'], comments[:2])
+        response = self.authorized_client.get(url, {
+            'comments_after': response.context['next_comments_cursor']})
+        self.assertEqual(response.context['all_comments'], comments[2:])
+        self.assertIsNone(response.context['next_comments_cursor'])
+
+
+@override_settings(FOLLOWS_PER_PAGE=2)
+class FollowStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [User.objects.create_user(username=f'reader{i}')
+                       for i in range(3)]
+
+    def setUp(self):
+        self.clients = []
+        for reader in self.readers:
+            client = Client()
+            client.force_login(reader)
+            self.clients.append(client)
+
+    def follow_all(self):
+        for client in self.clients:
+            client.get(reverse('posts:profile_follow',
+                               args=(self.author.username,)))
+
+    def test_counters(self):
+        """Повторная подписка не меняет счётчики, отписка уменьшает."""
+        self.follow_all()
+        self.follow_all()
+        stats = FollowStats.objects.get(user=self.author)
+        self.assertEqual(stats.followers_count, 3)
+        self.assertEqual(
+            FollowStats.objects.get(user=self.readers[0]).following_count, 1)
+        for _ in range(2):
+            self.clients[0].get(reverse('posts:profile_unfollow',
+                                        args=(self.author.username,)))
+        stats.refresh_from_db()
+        self.assertEqual(stats.followers_count, 2)
+
+    def test_profile_following_flag(self):
+        """Профиль знает, подписан ли на автора текущий пользователь."""
+        url = reverse('posts:profile', args=(self.author.username,))
+        self.assertFalse(self.clients[0].get(url).context['following'])
+        self.follow_all()
+        response = self.clients[0].get(url)
+        self.assertTrue(response.context['following'])
+        self.assertEqual(response.context['stats'].followers_count, 3)
+
+    def test_followers_pages(self):
+        """Подписчики идут от новых к старым страницами после ?after=."""
+        self.follow_all()
+        url = reverse('posts:followers', args=(self.author.username,))
+        response = self.clients[0].get(url)
+        self.assertEqual(response.context['users'], self.readers[:0:-1])
+        self.assertEqual(response.context['following'], set())
+        response = self.clients[0].get(
+            url, {'after': response.context['next_after']})
+        self.assertEqual(response.context['users'], self.readers[:1])
+        self.assertIsNone(response.context['next_after'])
+        response = self.clients[0].get(
+            reverse('posts:following', args=(self.readers[0].username,)))
+        self.assertEqual(response.context['following'], {self.author.pk})
+
+
+class DeferredFieldsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author',
+                                              first_name='Лев')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='description')
+        for i in range(3):
+            post = Post.objects.create(author=cls.author, text='Текст ' * 200,
+                                       group=cls.group)
+        TrendingPost.objects.create(post=post, score=1)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Follow.objects.create(user=cls.author, author=cls.reader)
+        other = User.objects.create_user(username='other')
+        Recommendation.objects.create(user=cls.reader, author=other, score=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_feeds_do_not_load_deferred_fields(self):
+        """Шаблоны лент не обращаются к полям вне проекции запроса."""
+        urls = [
+            (reverse('posts:index'), {}),
+            (reverse('posts:index'), {'fragment': 1}),
+            (reverse('posts:group_list', args=(self.group.slug,)), {}),
+            (reverse('posts:profile', args=(self.author.username,)), {}),
+            (reverse('posts:follow_index'), {}),
+            (reverse('posts:trending'), {}),
+            (reverse('posts:followers', args=(self.author.username,)), {}),
+            (reverse('posts:following', args=(self.author.username,)), {}),
+        ]
+        for url, params in urls:
+            with self.subTest(url=url, params=params):
+                cache.clear()
+                with mock.patch.object(
+                        Model, 'refresh_from_db', autospec=True,
+                        side_effect=Model.refresh_from_db) as refresh:
+                    response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                loads = [(type(call[0][0]).__name__, call[1].get('fields'))
+                         for call in refresh.call_args_list]
+                self.assertEqual(loads, [])
+
+
+@override_settings(STREAM_PAGES=True)
+class StreamingPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.posts = [Post.objects.create(author=cls.user, text=f'Пост {i}')
+                     for i in range(3)]
+        Comment.objects.create(post=cls.posts[0], author=cls.user,
+                               text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_feed_streams_cards_after_head(self):
+        """Шапка уходит первой частью, карточки - отдельными частями."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertIn('<head>', chunks[0])
+        self.assertNotIn('Пост', chunks[0])
+        # начало, карточки, курсор, конец
+        self.assertEqual(len(chunks), len(self.posts) + 3)
+        page = ''.join(chunks)
+        self.assertLess(page.index('Пост 2'), page.index('Пост 0'))
+        self.assertEqual(page.count('<hr>'), len(self.posts) - 1)
+
+    def test_head_sent_before_rows(self):
+        """Посты читаются из базы после отправки начала страницы."""
+        response = self.client.get(reverse('posts:index'))
+        chunks = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            next(chunks)
+        with CaptureQueriesContext(connection) as queries:
+            rest = b''.join(chunks).decode()
+        self.assertIn('Пост 0', rest)
+        self.assertTrue(any('COUNT' not in query['sql']
+                            and 'posts_post' in query['sql']
+                            for query in queries))
+
+    def test_gzip_head_sent_first(self):
+        """Со сжатием начало страницы тоже приходит отдельной частью."""
+        response = self.client.get(reverse('posts:index'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        chunks = iter(response.streaming_content)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        head = decompressor.decompress(next(chunks)).decode()
+        self.assertIn('</head>', head)
+        self.assertNotIn('Пост', head)
+
+    @override_settings(COMMENTS_PER_PAGE=1)
+    def test_comments_cursor_after_comments(self):
+        """Ссылка на следующие комментарии выводится после них."""
+        Comment.objects.create(post=self.posts[0], author=self.user,
+                               text='Второй')
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.posts[0].id,)))
+        page = b''.join(response.streaming_content).decode()
+        self.assertNotIn('Второй', page)
+        self.assertLess(page.index('Комментарий'),
+                        page.index('?comments_after='))
+
+    def test_post_detail_streams_comments(self):
+        """Комментарии на странице поста идут потоком, CSRF-кука ставится."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.posts[0].id,)))
+        page = b''.join(response.streaming_content).decode()
+        self.assertIn('Комментарий', page)
+        self.assertIn('csrftoken', response.cookies)
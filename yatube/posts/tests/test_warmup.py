@@ -0,0 +1,91 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.templatetags.thumbnails import post_thumbnail
+from .. import notifications
+from ..models import Comment, Group, Post
+from ..trending import aggregator
+from ..views import follow
+from ..warmup import make_thumbnail, page_urls
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class WarmCacheTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def tearDown(self):
+        # события не должны сбрасываться таймером в чужой тест
+        notifications.buffer.flush()
+        aggregator.flush()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='description')
+        self.quiet = Post.objects.create(author=self.author, text='Тихий')
+        self.post = Post.objects.create(
+            author=self.author, text='Пост', group=self.group,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF,
+                                     content_type='image/gif'))
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        follow(self.reader, self.author)
+
+    def test_page_urls(self):
+        """Главная, группы, профили и посты по популярности."""
+        self.assertEqual(page_urls(pages=2, groups=5, profiles=5, posts=1), [
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', args=['group']),
+            reverse('posts:profile', args=['author']),
+            reverse('posts:profile', args=['reader']),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ])
+
+    @override_settings(POST_THUMBNAIL_GEOMETRY='40x20')
+    def test_same_thumbnail_as_templates(self):
+        """Прогрев создаёт ту же миниатюру, что выводит страница поста."""
+        self.assertEqual(make_thumbnail(self.post.image.name), 'ok')
+        thumbnail = post_thumbnail(self.post.image.name)
+        self.assertEqual((thumbnail.width, thumbnail.height), (40, 20))
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertContains(response, thumbnail.url)
+
+    def test_warm_cache(self):
+        """Команда рендерит страницы без ошибок и кэширует карточки."""
+        out = StringIO()
+        call_command('warm_cache', workers=2, stdout=out, stderr=StringIO())
+        report = out.getvalue()
+        self.assertIn('Миниатюры: 1, ошибок: 0', report)
+        self.assertIn('ошибок: 0', report.split('Страницы')[1])
+        for post in (self.quiet, self.post):
+            self.assertIsNotNone(cache.get(
+                make_template_fragment_key('post_card', [post.pk])))
@@ -0,0 +1,118 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from core.db import atomic_write
+from .models import TrendingGroup, TrendingPost
+
+# Начало отсчёта шкалы рейтинга: 2020-01-01 UTC
+EPOCH = 1577836800
+
+flusher = ThreadPoolExecutor(max_workers=1)
+
+
+def log_score(weight, when):
+    """Вес события в логарифмической шкале.
+
+    Вместо того чтобы уменьшать все рейтинги со временем, новые события
+    получают вес 2 ** (возраст / период полураспада). Порядок сумм при
+    этом тот же, что у затухающих рейтингов, а хранить удобнее log2.
+    """
+    return math.log2(weight) + (when - EPOCH) / settings.TRENDING_HALF_LIFE
+
+
+def log_add(a, b):
+    """log2(2 ** a + 2 ** b) без переполнения."""
+    if a < b:
+        a, b = b, a
+    return a + math.log2(1 + 2 ** (b - a))
+
+
+def save_scores(model, scores):
+    """Добавляет накопленные рейтинги к строкам model двумя bulk-запросами."""
+    existing = model.objects.in_bulk(list(scores))
+    updated, created = [], []
+    for pk, score in scores.items():
+        row = existing.get(pk)
+        if row is None:
+            created.append(pk)
+        else:
+            row.score = log_add(row.score, score)
+            updated.append(row)
+    model.objects.bulk_update(updated, ['score'], batch_size=500)
+    if created:
+        # объект мог быть удалён, пока событие ждало сброса
+        target = model._meta.pk.related_model
+        alive = target.objects.filter(pk__in=created).values_list(
+            'pk', flat=True)
+        model.objects.bulk_create(
+            [model(pk=pk, score=scores[pk]) for pk in alive],
+            batch_size=500)
+    cutoff = log_score(1, time.time()) - settings.TRENDING_KEEP
+    model.objects.filter(score__lt=cutoff).delete()
+
+
+class Aggregator:
+    """Копит рейтинги в памяти и периодически сбрасывает их в базу.
+
+    Сброс выполняется в фоновом потоке через TRENDING_FLUSH_INTERVAL
+    секунд после первого несброшенного события, вне транзакции запроса.
+    Рейтинги складываются, поэтому процессы с собственными агрегаторами
+    не мешают друг другу; несброшенное при остановке теряется.
+    """
+
+    models = (TrendingPost, TrendingGroup)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {model: {} for model in self.models}
+        self.timer = None
+
+    def add(self, model, pk, weight, when=None):
+        value = log_score(weight, time.time() if when is None else when)
+        with self.lock:
+            scores = self.pending[model]
+            scores[pk] = log_add(scores[pk], value) if pk in scores else value
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    settings.TRENDING_FLUSH_INTERVAL, flusher.submit,
+                    [self.flush_in_background])
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {model: {} for model in self.models}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        for model, scores in pending.items():
+            if scores:
+                atomic_write(save_scores, model, scores)
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+
+aggregator = Aggregator()
+
+
+def add_post_event(post_id, group_id, kind):
+    """Учитывает событие после коммита: откаченные события не считаются."""
+    weight = settings.TRENDING_WEIGHTS[kind]
+    when = time.time()
+
+    def add():
+        aggregator.add(TrendingPost, post_id, weight, when)
+        if group_id:
+            aggregator.add(TrendingGroup, group_id, weight, when)
+
+    transaction.on_commit(add)
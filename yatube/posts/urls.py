@@ -7,6 +7,9 @@ urlpatterns = [
     path('', views.index),
     path('index/', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('trending/', views.trending, name='trending'),
+    path('groups/hot/', views.hot_groups, name='hot_groups'),
+    path('groups/search/', views.group_search, name='group_search'),
     path('about/', include('about.urls', namespace='about')),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
@@ -15,8 +18,13 @@ urlpatterns = [
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('notifications/', views.notifications, name='notifications'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow, name='profile_unfollow'),
+    path('profile/<str:username>/followers/',
+         views.followers, name='followers'),
+    path('profile/<str:username>/following/',
+         views.following, name='following'),
 ]
@@ -0,0 +1,87 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.template.defaultfilters import linebreaksbr
+from django.utils.dateparse import parse_datetime
+from django.utils.text import Truncator
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор в пару (дата, id), при ошибке - ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        moment = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise ValueError('Некорректный курсор') from error
+    if moment is None:
+        raise ValueError('Некорректный курсор')
+    return moment, pk
+
+
+class CursorPage:
+    """Объекты после курсора, упорядоченные по (field, id).
+
+    Строки читаются из базы только при обходе, поэтому курсор следующей
+    страницы (next_cursor, None для последней) известен после него.
+    Некорректный курсор - ValueError сразу.
+    """
+
+    def __init__(self, queryset, cursor, limit, field='pub_date',
+                 descending=True):
+        if descending:
+            ordering, lookup = (f'-{field}', '-id'), 'lt'
+        else:
+            ordering, lookup = (field, 'id'), 'gt'
+        if cursor:
+            value, pk = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': value})
+                | Q(**{field: value, f'id__{lookup}': pk}),
+                **{f'{field}__{lookup}e': value},
+            )
+        self.queryset = queryset.order_by(*ordering)[:limit + 1]
+        self.limit = limit
+        self.field = field
+        self.next_cursor = None
+
+    def __iter__(self):
+        last = None
+        for index, item in enumerate(self.queryset):
+            if index == self.limit:
+                self.next_cursor = encode_cursor(getattr(last, self.field),
+                                                 last.pk)
+                return
+            last = item
+            yield item
+
+
+def paginate_after(queryset, cursor, limit, field='pub_date',
+                   descending=True):
+    """Страница объектов после курсора, упорядоченных по (field, id).
+
+    Возвращает список объектов и курсор следующей страницы (None, если
+    страница последняя).
+    """
+    page = CursorPage(queryset, cursor, limit, field, descending)
+    return list(page), page.next_cursor
+
+
+def render_text(text, length):
+    """HTML текста поста и его начала для лент.
+
+    Возвращает (html, excerpt_html, обрезан ли текст); HTML экранирован,
+    переводы строк заменены на <br>, как делает фильтр linebreaksbr.
+    """
+    html = linebreaksbr(text, autoescape=True)
+    short = Truncator(text).chars(length)
+    if short == text:
+        return html, html, False
+    return html, linebreaksbr(short, autoescape=True), True
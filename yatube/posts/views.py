@@ -1,71 +1,251 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.cache import patch_vary_headers
 
+from core.ratelimit import ratelimit
+from core.streaming import render_stream
+from core.writer import run_write
+from .choices import search_group_choices
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Comment, Follow
+from .missing import skip_missing
+from .models import (Post, Group, User, Follow, FollowStats, Notification,
+                     Recommendation, TrendingGroup, TrendingPost)
+from .notifications import mark_read
+from .utils import CursorPage, encode_cursor, paginate_after
 
 AMOUNT_OF_POSTS = 10
 
+# Поля, которые выводят includes/post_card.html и списки пользователей;
+# остальные колонки (полный текст, пароль, описание группы) не читаются.
+USER_FIELDS = ('id', 'username', 'first_name', 'last_name')
+POST_CARD_FIELDS = (
+    'id', 'pub_date', 'image', 'excerpt_html', 'is_truncated',
+    'comment_count', 'author', 'group', 'group__slug',
+    *(f'author__{name}' for name in USER_FIELDS),
+)
+
+
+def related_fields(relation, fields):
+    return [relation, *(f'{relation}__{name}' for name in fields)]
+
+
+def card_queryset(queryset):
+    """Посты ленты только с полями, нужными карточке."""
+    return queryset.select_related('author', 'group').only(*POST_CARD_FIELDS)
+
+
+def is_fragment(request):
+    return 'fragment' in request.GET or 'HTTP_X_FRAGMENT' in request.META
+
+
+def page_cursor(page_obj):
+    """Курсор после последнего поста страницы, None для последней."""
+    if not page_obj.has_next():
+        return None
+    last = page_obj[-1]
+    return encode_cursor(last.pub_date, last.pk)
+
+
+def render_feed(request, template_name, post_list, context=None):
+    """Рендерит ленту постами по AMOUNT_OF_POSTS на страницу.
+
+    В режиме фрагмента (?fragment=1 или заголовок X-Fragment) отдаёт
+    только карточки постов после ?cursor=, курсор следующей порции -
+    в заголовке X-Next-Cursor.
+    """
+    if is_fragment(request):
+        try:
+            posts, next_cursor = paginate_after(
+                post_list, request.GET.get('cursor'), AMOUNT_OF_POSTS)
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+        response = render(request, 'includes/post_list.html',
+                          {'posts': posts})
+        response['X-Next-Cursor'] = next_cursor or ''
+        patch_vary_headers(response, ('X-Fragment',))
+        return response
 
-def index(request):
-    post_list = Post.objects.select_related('group', 'author').all()
     paginator = Paginator(post_list, AMOUNT_OF_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    context = {
-        'page_obj': page_obj,
-    }
-    return render(request, 'posts/index.html', context)
+    context = context or {}
+    context['page_obj'] = page_obj
+    if settings.STREAM_PAGES:
+        # посты читаются при обходе page_obj, уже после начала страницы
+        response = render_stream(
+            request, template_name, context, page_obj,
+            'includes/post_card.html', 'post', separator='<hr>',
+            end_template='includes/feed_end.html',
+            end_context=lambda: {'next_cursor': page_cursor(page_obj)})
+    else:
+        context['next_cursor'] = page_cursor(page_obj)
+        response = render(request, template_name, context)
+    patch_vary_headers(response, ('X-Fragment',))
+    return response
 
 
+def index(request):
+    post_list = card_queryset(Post.objects.all())
+    return render_feed(request, 'posts/index.html', post_list)
+
+
+@skip_missing('group', 'slug')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('group', 'author')
-    paginator = Paginator(posts, AMOUNT_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = card_queryset(group.posts.all())
+    return render_feed(request, 'posts/group_list.html', posts,
+                       {'group': group})
+
+
+def following_ids(user, author_ids):
+    """Id авторов из author_ids, на которых подписан user, одним запросом."""
+    if not user.is_authenticated or not author_ids:
+        return set()
+    return set(Follow.objects.filter(user=user, author_id__in=author_ids)
+               .values_list('author_id', flat=True))
+
+
+def get_follow_stats(user):
+    try:
+        return user.follow_stats
+    except FollowStats.DoesNotExist:
+        return FollowStats(user=user)
+
+
+def trending(request):
+    """Посты и группы с наибольшим затухающим рейтингом активности."""
+    ranked = (
+        TrendingPost.objects
+        .select_related('post__author', 'post__group')
+        .only(*related_fields('post', POST_CARD_FIELDS))
+        [:settings.TRENDING_POSTS]
+    )
+    paginator = Paginator([item.post for item in ranked], AMOUNT_OF_POSTS)
     context = {
-        'group': group,
-        'page_obj': page_obj,
+        'page_obj': paginator.get_page(request.GET.get('page')),
+        'hot_groups': TrendingGroup.objects.select_related('group')[:5],
     }
-    return render(request, 'posts/group_list.html', context)
+    return render(request, 'posts/trending.html', context)
+
+
+def group_search(request):
+    """Группы с ?q= в названии для GroupAutocompleteSelect."""
+    choices = search_group_choices(request.GET.get('q', ''),
+                                   settings.GROUP_SEARCH_LIMIT)
+    return JsonResponse({'results': [
+        {'id': pk, 'title': title} for pk, title in choices
+    ]})
 
 
+def hot_groups(request):
+    groups = TrendingGroup.objects.select_related(
+        'group')[:settings.HOT_GROUPS]
+    return render(request, 'posts/hot_groups.html', {'hot_groups': groups})
+
+
+@skip_missing('user', 'username')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    user_posts = author.posts.select_related('group', 'author')
-    paginator = Paginator(user_posts, AMOUNT_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related('follow_stats'), username=username)
+    user_posts = card_queryset(author.posts.all())
+    return render_feed(request, 'posts/profile.html', user_posts, {
+        'author': author,
+        'stats': get_follow_stats(author),
+        'following': author.pk in following_ids(request.user, [author.pk]),
+    })
+
+
+def follow_list(request, username, direction):
+    """Подписчики или подписки пользователя страницами после ?after=.
+
+    Страницы идут по убыванию id подписки, поэтому глубокие страницы
+    не требуют OFFSET.
+    """
+    author = get_object_or_404(
+        User.objects.select_related('follow_stats'), username=username)
+    if direction == 'followers':
+        follows = Follow.objects.filter(author=author)
+        user_field = 'user'
+    else:
+        follows = Follow.objects.filter(user=author)
+        user_field = 'author'
+    follows = follows.select_related(user_field).only(
+        'id', *related_fields(user_field, USER_FIELDS))
+    try:
+        after = int(request.GET.get('after') or 0)
+    except ValueError:
+        return HttpResponseBadRequest('after должен быть числом')
+    if after:
+        follows = follows.filter(id__lt=after)
+    follows = list(follows.order_by('-id')[:settings.FOLLOWS_PER_PAGE + 1])
+    next_after = None
+    if len(follows) > settings.FOLLOWS_PER_PAGE:
+        follows = follows[:settings.FOLLOWS_PER_PAGE]
+        next_after = follows[-1].id
+    users = [getattr(follow, user_field) for follow in follows]
     context = {
         'author': author,
-        'page_obj': page_obj,
+        'stats': get_follow_stats(author),
+        'direction': direction,
+        'users': users,
+        'following': following_ids(request.user, [u.pk for u in users]),
+        'next_after': next_after,
     }
-    return render(request, 'posts/profile.html', context)
+    return render(request, 'posts/follow_list.html', context)
+
+
+def followers(request, username):
+    return follow_list(request, username, 'followers')
 
 
+def following(request, username):
+    return follow_list(request, username, 'following')
+
+
+@skip_missing('post', 'post_id')
 def post_detail(request, post_id):
-    user_post = get_object_or_404(Post, id=post_id)
+    user_post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id)
     form_comments = CommentForm(request.POST or None)
     all_posts = user_post.author.posts.all()
-    all_comments = Comment.objects.filter(post=user_post)
+    try:
+        comments = CursorPage(
+            user_post.comments.select_related('author'),
+            request.GET.get('comments_after'),
+            settings.COMMENTS_PER_PAGE,
+            field='created',
+            descending=False,
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
     context = {
         'user_post': user_post,
         'all_posts': all_posts,
         'form_comments': form_comments,
-        'all_comments': all_comments,
     }
+    if settings.STREAM_PAGES:
+        return render_stream(
+            request, 'posts/post_detail.html', context, comments,
+            'includes/comment.html', 'comment',
+            end_template='includes/comments_end.html',
+            end_context=lambda: {
+                'next_comments_cursor': comments.next_cursor})
+    context['all_comments'] = list(comments)
+    context['next_comments_cursor'] = comments.next_cursor
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@ratelimit('post')
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        run_write(post.save)
         return redirect('posts:profile', username=request.user)
     return render(request, 'posts/create_post.html', {'form': form})
     context = {
@@ -81,7 +261,9 @@ def post_edit(request, post_id):
     form = PostForm(request.POST or None, files=request.FILES or None,
                     instance=post)
     if form.is_valid():
-        form.save()
+        # остальные поля (comment_count) могли измениться с начала запроса
+        run_write(form.save(commit=False).save,
+                  update_fields=PostForm.Meta.fields)
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -91,6 +273,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@ratelimit('comment')
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -98,7 +281,7 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        run_write(comment.save)
     return redirect('posts:post_detail', post_id)
 
 
@@ -107,26 +290,63 @@ def follow_index(request):
     follow = Follow.objects.filter(user=request.user).values_list(
         "author_id", flat=True
     )
-    post_list = Post.objects.filter(author_id__in=follow)
-    paginator = Paginator(post_list, AMOUNT_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {
-        'page_obj': page_obj,
-    }
-    return render(request, 'posts/follow.html', context)
+    post_list = card_queryset(Post.objects.filter(author_id__in=follow))
+    recommendations = (
+        Recommendation.objects.filter(user=request.user)
+        .exclude(author__following__user=request.user)
+        .select_related('author')
+        .only('id', *related_fields('author', USER_FIELDS))
+        [:settings.RECOMMENDATIONS_SHOWN]
+    )
+    return render_feed(request, 'posts/follow.html', post_list,
+                       {'recommendations': recommendations})
 
 
 @login_required
+def notifications(request):
+    """Последние уведомления; показанные отмечаются прочитанными."""
+    items = list(
+        Notification.objects.filter(recipient=request.user)
+        .select_related('actor')
+        .only('id', 'kind', 'post', 'created', 'is_read',
+              *related_fields('actor', USER_FIELDS))
+        [:settings.NOTIFICATIONS_PER_PAGE]
+    )
+    unread = [item.pk for item in items if not item.is_read]
+    if unread:
+        run_write(mark_read, request.user.pk, unread)
+    return render(request, 'posts/notifications.html',
+                  {'notifications': items})
+
+
+@login_required
+@ratelimit('follow', methods=None)
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.get_or_create(user=request.user, author=author)
+        run_write(follow, request.user, author)
     return redirect("posts:index")
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    run_write(unfollow, request.user, author)
     return redirect("posts:index")
+
+
+def follow(user, author):
+    """Подписка со счётчиками; повторная подписка ничего не меняет."""
+    _, created = Follow.objects.get_or_create(user=user, author=author)
+    if created:
+        FollowStats.change(author.pk, 'followers_count', 1)
+        FollowStats.change(user.pk, 'following_count', 1,
+                           recommendations_stale=True)
+
+
+def unfollow(user, author):
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    if deleted:
+        FollowStats.change(author.pk, 'followers_count', -deleted)
+        FollowStats.change(user.pk, 'following_count', -deleted,
+                           recommendations_stale=True)
@@ -0,0 +1,131 @@
+"""Прогрев кэша после деплоя или очистки кэша (команда warm_cache).
+
+Страницы рендерятся через тестовый клиент Django в этом же процессе,
+либо запрашиваются по HTTP у запущенного сервера: LocMemCache живёт
+в памяти своего процесса, и прогреть его можно только вторым способом.
+Миниатюры хранятся в файлах и базе sorl, поэтому годятся при любом кэше.
+"""
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from core.templatetags.thumbnails import post_thumbnail
+from .models import (FollowStats, Group, Post, TrendingGroup, TrendingPost,
+                     User)
+from .views import AMOUNT_OF_POSTS
+
+
+def top(ranked, fallback, limit):
+    """Первые limit id из ranked, дополненные из fallback без повторов."""
+    ids = list(ranked[:limit])
+    if len(ids) < limit:
+        ids += [pk for pk in fallback.exclude(pk__in=ids)[:limit - len(ids)]]
+    return ids
+
+
+def popular_post_ids(limit):
+    return top(TrendingPost.objects.values_list('post_id', flat=True),
+               Post.objects.order_by('-comment_count', '-pk')
+               .values_list('pk', flat=True), limit)
+
+
+def hot_group_ids(limit):
+    return top(TrendingGroup.objects.values_list('group_id', flat=True),
+               Group.objects.annotate(total=Count('posts'))
+               .order_by('-total', 'pk').values_list('pk', flat=True), limit)
+
+
+def top_author_ids(limit):
+    return top(FollowStats.objects.order_by('-followers_count')
+               .values_list('user_id', flat=True),
+               User.objects.annotate(total=Count('posts'))
+               .order_by('-total', 'pk').values_list('pk', flat=True), limit)
+
+
+def ordered_values(model, ids, field):
+    values = dict(model.objects.filter(pk__in=ids).values_list('pk', field))
+    return [values[pk] for pk in ids if pk in values]
+
+
+def page_urls(pages, groups, profiles, posts):
+    """Адреса страниц для прогрева, от главной к менее посещаемым."""
+    index = reverse('posts:index')
+    result = [index] + [f'{index}?page={number}'
+                        for number in range(2, pages + 1)]
+    result += [reverse('posts:group_list', args=[slug]) for slug in
+               ordered_values(Group, hot_group_ids(groups), 'slug')]
+    result += [reverse('posts:profile', args=[username]) for username in
+               ordered_values(User, top_author_ids(profiles), 'username')]
+    result += [reverse('posts:post_detail', args=[pk])
+               for pk in popular_post_ids(posts)]
+    return result
+
+
+def thumbnail_images(pages, posts):
+    """Картинки постов первых pages страниц главной и популярных постов."""
+    with_image = Post.objects.exclude(image='')
+    images = list(with_image.values_list('image', flat=True)
+                  [:pages * AMOUNT_OF_POSTS])
+    images += with_image.filter(pk__in=popular_post_ids(posts)).values_list(
+        'image', flat=True)
+    return list(dict.fromkeys(images))
+
+
+def make_thumbnail(name):
+    """Та же миниатюра, что выводят шаблоны постов."""
+    return 'ok' if post_thumbnail(name) else 'ошибка'
+
+
+def client_fetch():
+    """Запрос к приложению в этом процессе через тестовый клиент."""
+    host = settings.ALLOWED_HOSTS[0]
+
+    def fetch(url):
+        # клиент хранит cookies и не годится для нескольких потоков
+        return Client(HTTP_HOST=host).get(url).status_code
+
+    return fetch
+
+
+def http_fetch(base_url, timeout=30):
+    """Запрос к запущенному серверу по base_url."""
+    def fetch(url):
+        with urllib.request.urlopen(base_url.rstrip('/') + url,
+                                    timeout=timeout) as response:
+            response.read()
+            return response.status
+
+    return fetch
+
+
+def run(func, items, workers, progress=None):
+    """Выполняет func для каждого элемента не более чем в workers потоков.
+
+    progress(item, result, seconds) вызывается по мере готовности;
+    исключение считается результатом. Возвращает время каждого элемента.
+    """
+    def timed(item):
+        started = time.monotonic()
+        try:
+            result = func(item)
+        except Exception as error:
+            result = error
+        finally:
+            connections.close_all()
+        return item, result, time.monotonic() - started
+
+    timings = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(timed, item) for item in items]
+        for future in as_completed(futures):
+            item, result, seconds = future.result()
+            timings.append(seconds)
+            if progress:
+                progress(item, result, seconds)
+    return timings
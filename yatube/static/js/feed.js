@@ -0,0 +1,49 @@
+// Подгружает следующие посты ленты, когда читатель докручивает до конца.
+// Сервер отдаёт только карточки (X-Fragment), курсор - в X-Next-Cursor.
+// Курсор первой страницы - в .feed-end: при потоковой отдаче он
+// известен только после карточек.
+(function () {
+  var end = document.querySelector('.feed-end[data-next-cursor]');
+  if (!end || !end.dataset.nextCursor || !window.fetch
+      || !('IntersectionObserver' in window)) {
+    return;
+  }
+  var pagination = document.querySelector('.pagination');
+  var nav = pagination && pagination.closest('nav');
+  if (nav) {
+    nav.hidden = true;
+  }
+  var loading = false;
+
+  var observer = new IntersectionObserver(function (entries) {
+    if (!entries[0].isIntersecting || loading) {
+      return;
+    }
+    loading = true;
+    var url = new URL(window.location.href);
+    url.searchParams.delete('page');
+    url.searchParams.set('cursor', end.dataset.nextCursor);
+    fetch(url, {headers: {'X-Fragment': '1'}, credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        end.dataset.nextCursor = response.headers.get('X-Next-Cursor') || '';
+        return response.text();
+      })
+      .then(function (html) {
+        end.insertAdjacentHTML('beforebegin', html);
+        loading = false;
+        if (!end.dataset.nextCursor) {
+          observer.disconnect();
+        }
+      })
+      .catch(function () {
+        observer.disconnect();
+        if (nav) {
+          nav.hidden = false;
+        }
+      });
+  });
+  observer.observe(end);
+})();
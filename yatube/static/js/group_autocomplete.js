@@ -0,0 +1,27 @@
+// Поиск группы для select[data-autocomplete-url] (GroupAutocompleteSelect):
+// варианты подгружаются с сервера по мере ввода.
+document.querySelectorAll('select[data-autocomplete-url]').forEach((select) => {
+  const input = document.createElement('input');
+  input.type = 'search';
+  input.className = 'form-control mb-2';
+  input.placeholder = 'Поиск группы';
+  select.before(input);
+
+  let timer;
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(async () => {
+      const url = `${select.dataset.autocompleteUrl}?q=${encodeURIComponent(input.value)}`;
+      const response = await fetch(url);
+      if (!response.ok) return;
+      const { results } = await response.json();
+      const selected = select.value;
+      select.querySelectorAll('option').forEach((option) => {
+        if (option.value && option.value !== selected) option.remove();
+      });
+      results.forEach(({ id, title }) => {
+        if (String(id) !== selected) select.add(new Option(title, id));
+      });
+    }, 250);
+  });
+});
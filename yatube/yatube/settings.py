@@ -22,7 +22,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = '&(w^8qzti490_ua!9g(v(3d+ej6mzou@qky9#6z3#+)-@b2u&c'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', 'True').lower() in ('true', '1')
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -50,28 +51,44 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # В продакшене шаблоны разбираются один раз и хранятся в памяти
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
+# Скомпилировать все шаблоны при старте сервера в yatube/wsgi.py
+# (core.warmup)
+TEMPLATE_WARMUP = not DEBUG
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'posts.context_processors.notifications',
             ],
         },
     },
@@ -86,15 +103,79 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
+# Настройки соединения с SQLite, применяются в core.db.set_sqlite_pragmas
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+}
+
+# Повтор коротких транзакций записи при 'database is locked'
+WRITE_RETRY_ATTEMPTS = 5
+WRITE_RETRY_DELAY = 0.05
+
+# Выполнять записи из комментариев, подписок и создания постов в одном
+# потоке (core.writer), объединяя их в общие транзакции; против SQLite
+# с SQLITE_PRAGMAS выигрыш в benchmarks/sqlite_writes.py ~1.1-1.3 раза
+SERIALIZED_WRITES = False
+WRITER_BATCH_SIZE = 100
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Ограничение частоты записи (core.ratelimit): область -> (запросов, секунд).
+# Считается на пользователя, для анонимов - на IP-адрес.
+RATELIMIT_ENABLED = True
+RATELIMITS = {
+    'post': (20, 60),
+    'comment': (30, 60),
+    'follow': (60, 60),
+    'signup': (10, 60 * 60),
+}
+
+# Сколько строк не дальше считать в отфильтрованных списках админки
+ADMIN_COUNT_LIMIT = 10000
+# Поиск по тексту в админке постов - только среди стольких последних id
+ADMIN_SEARCH_WINDOW = 10000
+
+# Больше стольких групп форма поста ищет группу по вводу, а не списком;
+# сколько групп отдаёт поиск
+GROUP_SELECT_LIMIT = 200
+GROUP_SEARCH_LIMIT = 20
+# Сколько секунд хранить список групп: сброс при изменении группы доходит
+# только до кэша своего процесса, остальные увидят изменения не позже этого
+GROUP_CHOICES_TIMEOUT = 60
+
+# Строк в одной транзакции массовых операций (posts.bulk)
+BULK_BATCH_SIZE = 500
+
+# Кэш общий для всех процессов сервера. У LocMemCache он свой в каждом
+# процессе: сброс кэша при выходе или смене пароля не дойдёт до других
+# процессов, поэтому сессии и пользователь запроса тогда не кэшируются.
+SHARED_CACHE = (
+    CACHES['default']['BACKEND']
+    != 'django.core.cache.backends.locmem.LocMemCache'
+)
+
+# Сессии читаются из кэша и сквозной записью сохраняются в базу
+SESSION_ENGINE = ('django.contrib.sessions.backends.cached_db'
+                  if SHARED_CACHE else 'django.contrib.sessions.backends.db')
+
+# Сколько секунд хранить пользователя запроса в кэше (core.auth)
+USER_CACHE_TIMEOUT = 60 * 5
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -137,8 +218,126 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# В продакшене статика с хэшем в имени и сжатыми копиями (core.storage)
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'core.storage.CompressedManifestStaticFilesStorage')
+
+# Отдавать статику из STATIC_ROOT самим Django (core.views.serve_static),
+# если перед ним нет веб-сервера; файлы без хэша кэшируются на STATIC_MAX_AGE
+SERVE_STATIC = not DEBUG
+STATIC_MAX_AGE = 60 * 60
+
+# Сжатие ответов (core.middleware.GZipMiddleware): не короче стольких байт
+# и только текстовых типов
+GZIP_MIN_LENGTH = 1024
+GZIP_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Отдавать ленты и страницу поста потоком (core.streaming): шапка уходит
+# сразу, карточки - по мере рендера. Такие ответы не кэширует cache_page.
+STREAM_PAGES = False
+
+# Миниатюра картинки поста в ленте и на странице поста (sorl.thumbnail)
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+# Символов текста поста в карточке ленты, дальше - ссылка «Читать дальше»
+POST_EXCERPT_LENGTH = 500
+
+# Комментариев на одной странице поста
+COMMENTS_PER_PAGE = 50
+
+# Пользователей на странице подписчиков и подписок
+FOLLOWS_PER_PAGE = 50
+
+# Рекомендации авторов: сколько хранить и показывать на пользователя
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_SHOWN = 5
+# Пользователей, обрабатываемых за одну транзакцию build_recommendations
+RECOMMENDATIONS_CHUNK_SIZE = 500
+
+# Популярное (posts.trending): период полураспада рейтинга в секундах,
+# вес событий, как часто сбрасывать рейтинги в базу и через сколько
+# периодов полураспада забывать неактивные посты и группы.
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_WEIGHTS = {'post': 1.0, 'comment': 2.0, 'follow': 3.0}
+TRENDING_FLUSH_INTERVAL = 30
+TRENDING_KEEP = 20
+# Сколько постов и групп показывать в рейтингах
+TRENDING_POSTS = 50
+HOT_GROUPS = 20
+
+# Уведомления (posts.notifications): сбрасываются в базу пачкой, когда
+# набралось NOTIFICATIONS_BATCH_SIZE или прошло NOTIFICATIONS_FLUSH_INTERVAL
+# секунд. compact_notifications удаляет прочитанные старше
+# NOTIFICATIONS_KEEP_DAYS дней и всё сверх NOTIFICATIONS_MAX_PER_USER.
+NOTIFICATIONS_BATCH_SIZE = 100
+NOTIFICATIONS_FLUSH_INTERVAL = 5
+NOTIFICATIONS_KEEP_DAYS = 30
+NOTIFICATIONS_MAX_PER_USER = 500
+NOTIFICATIONS_PER_PAGE = 50
+# Сколько секунд хранить число непрочитанных до пересчёта по базе
+NOTIFICATIONS_UNREAD_TIMEOUT = 60
+
+# Прогрев кэша (warm_cache): страниц главной, групп, профилей и постов
+# и сколько из них рендерить одновременно
+WARM_CACHE_PAGES = 5
+WARM_CACHE_GROUPS = 20
+WARM_CACHE_PROFILES = 20
+WARM_CACHE_POSTS = 50
+WARM_CACHE_WORKERS = 4
+
+# Быстрые 404 (posts.missing): профили, группы и посты, которых точно нет,
+# отсекаются фильтром Блума и кэшем промахов без запроса к базе. О новых
+# пользователях, группах и постах другие процессы узнают только через
+# общий кэш, поэтому с LocMemCache (у каждого процесса свой) выключено.
+MISSING_CACHE_ENABLED = SHARED_CACHE
+# Сколько секунд помнить значение, на которое view ответил 404
+MISSING_CACHE_TIMEOUT = 60 * 5
+# Раз в сколько секунд процесс строит фильтр заново, его минимальная
+# ёмкость и доля ложных «может быть есть»
+MISSING_FILTER_MAX_AGE = 60 * 10
+MISSING_FILTER_CAPACITY = 1000
+MISSING_FILTER_ERROR_RATE = 0.01
+# Сколько хранить в кэше заготовленную страницу 404 (core.views.not_found)
+NOT_FOUND_CACHE_TIMEOUT = 60 * 60
+
+# JSON API (api/v1/)
+API_PAGE_SIZE = 10
+API_MAX_PAGE_SIZE = 100
+API_CACHE_MAX_AGE = 30
+API_BATCH_MAX_IDS = 100
+API_POST_CACHE_TIMEOUT = 60 * 5
+
+# Server-Sent Events (api/v1/events/). Каждое соединение занимает поток
+# сервера, поэтому их число и время жизни ограничены.
+SSE_MAX_CONNECTIONS = 100
+SSE_QUEUE_SIZE = 100
+SSE_KEEPALIVE = 15
+SSE_MAX_DURATION = 60 * 5
+SSE_RETRY = 3000
+CHANGES_MAX_IDS = 100
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь (core.mail.OutboxBackend) и отправляются
+# командой send_outbox через OUTBOX_EMAIL_BACKEND
+EMAIL_BACKEND = 'core.mail.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Писем за одно соединение, попыток на письмо, задержка перед первым
+# повтором (дальше удваивается) и на сколько секунд письмо занимает
+# отправитель
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_LEASE = 60 * 5